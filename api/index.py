@@ -2,9 +2,12 @@ import streamlit as st
 from streamlit.web import bootstrap
 import sys
 import os
+import asyncio
 import logging
+import queue
+import threading
 import time
-import re
+import string
 import markdown
 import json
 
@@ -13,32 +16,111 @@ sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
 
 from src.repurposer import ContentRepurposer
 from src.gemini_handler import GeminiHandler
+from src.content_fetcher import ContentFetcher
+from src.rate_limiter import GeminiRateLimiter, DailyQuotaExceeded
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+API_KEY_ALLOWED_CHARS = frozenset(string.ascii_letters + string.digits + "_-")
+
+# Example custom instructions shown in each content type's text area
+INSTRUCTION_PLACEHOLDERS = {
+    "linkedin": "E.g., Use more emojis, focus on leadership aspects, include a call-to-action at the end",
+    "twitter": "E.g., Include relevant hashtags, focus on data points, use more engaging language",
+    "email": "E.g., Write in a professional tone, include a personal story, add bullet points for key takeaways",
+    "thought_leadership": "E.g., Focus on industry trends, mention competing viewpoints, pose thought-provoking questions",
+}
+
+class FetchError(Exception):
+    """Raised when no content could be extracted from a URL."""
+
+@st.cache_resource(show_spinner=False)
+def get_fetcher():
+    """Shared ContentFetcher so its user agent pool is built once per process."""
+    return ContentFetcher()
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def cached_fetch(url):
+    """Fetch a URL once per hour; failures raise so they are never cached."""
+    content_data = get_fetcher().fetch_content(url)
+    if not content_data["content"]:
+        raise FetchError(url)
+    return content_data
+
+@st.cache_resource(show_spinner=False)
+def get_rate_limiter(api_key):
+    """One limiter per API key so every session using that key shares the budget."""
+    return GeminiRateLimiter()
+
+@st.cache_resource(show_spinner=False)
+def get_event_loop():
+    """One event loop for the whole app, running on a daemon thread, that drives every generation."""
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, name="repurpose-loop", daemon=True).start()
+    return loop
+
+@st.cache_resource(show_spinner=False)
+def get_repurposer(api_key):
+    """
+    Warm ContentRepurposer (Gemini client, fetcher) reused across reruns for the same key.
+    Safe to share: its Gemini calls always run on the app loop from get_event_loop, and
+    the SDK client itself lives on the handler's own long-lived loop.
+    """
+    return ContentRepurposer(api_key=api_key, rate_limiter=get_rate_limiter(api_key))
+
+@st.cache_resource(show_spinner=False)
+def get_gemini_handler(api_key):
+    """GeminiHandler used to validate a key, built once per key."""
+    return GeminiHandler(api_key=api_key)
+
+def show_rate_limit_usage(rate_limiter):
+    """Show the current Gemini quota usage in the sidebar."""
+    usage = rate_limiter.usage()
+    st.sidebar.subheader("API Usage")
+    st.sidebar.metric("Requests (last minute)", f"{usage['requests_per_minute']} / {rate_limiter.rpm}")
+    st.sidebar.metric("Tokens (last minute)", f"{usage['tokens_per_minute']} / {rate_limiter.tpm}")
+    st.sidebar.metric("Requests (today)", f"{usage['requests_per_day']} / {rate_limiter.rpd}")
+
+def stream_by_type(stream, content_types):
+    """
+    Drive an async (content_type, piece) stream on the app's event loop and split it
+    into one blocking generator per content type, suitable for st.write_stream.
+    """
+    queues = {content_type: queue.Queue() for content_type in content_types}
+
+    async def pump():
+        async for content_type, piece in stream:
+            queues[content_type].put(piece)
+
+    def report_error(future):
+        error = None if future.cancelled() else future.exception()
+        if error is not None:
+            # Hand the error to every consumer still waiting so it surfaces in the script thread
+            for pieces in queues.values():
+                pieces.put(error)
+
+    asyncio.run_coroutine_threadsafe(pump(), get_event_loop()).add_done_callback(report_error)
+
+    def drain(pieces):
+        while True:
+            piece = pieces.get()
+            if piece is None:
+                return
+            if isinstance(piece, Exception):
+                raise piece
+            yield piece
+
+    return {content_type: drain(pieces) for content_type, pieces in queues.items()}
+
 def is_valid_api_key(api_key):
     """Basic validation for Gemini API key format."""
-    if not api_key or not isinstance(api_key, str):
-        return False
-    pattern = r'^[A-Za-z0-9_-]{39}$'
-    return bool(re.match(pattern, api_key))
-
-def main():
-    st.set_page_config(
-        page_title="Content Repurposer",
-        page_icon="📝",
-        layout="wide",
-    )
-
-    if 'api_key' not in st.session_state:
-        st.session_state.api_key = ""
-    if 'api_key_valid' not in st.session_state:
-        st.session_state.api_key_valid = False
-
-    st.title("🔄 Content Repurposer")
-    st.subheader("Transform your articles into multiple content formats")
+    # Gemini API keys are 39 characters of letters, digits, '_' and '-'
+    return isinstance(api_key, str) and len(api_key) == 39 and set(api_key) <= API_KEY_ALLOWED_CHARS
 
+@st.fragment
+def about_panel():
+    """Static introduction to the app, isolated in its own fragment."""
     with st.expander("ℹ️ About this app", expanded=True):
         st.markdown("""
         This app helps you repurpose your long-form content into various formats:
@@ -58,6 +140,54 @@ def main():
         3.  Your API key is stored only in your browser session and is not saved by this app
         """)
 
+def show_result_actions(content_type, text):
+    """Copyable text area and download button for one generated result."""
+    # Also provide a raw text area for copying
+    with st.expander("Show copyable version"):
+        st.text_area(
+            "Raw Content",
+            value=text,
+            height=400,
+            key=f"{content_type}_raw_content"
+        )
+
+    st.download_button(
+        label=f"Download {content_type.capitalize()} Content",
+        data=text,
+        file_name=f"{content_type}_content.txt",
+        mime="text/plain",
+        key=f"{content_type}_download"
+    )
+
+@st.fragment
+def show_results(results):
+    """Previously generated content; interactions here only rerun this fragment."""
+    tabs = st.tabs([content_type.capitalize() for content_type in results])
+
+    for tab, (content_type, text) in zip(tabs, results.items()):
+        with tab:
+            st.markdown("### " + content_type.capitalize() + " Content")
+            # Same renderer as the live st.write_stream view; model output is never injected as raw HTML
+            st.markdown(text)
+            show_result_actions(content_type, text)
+
+def main():
+    st.set_page_config(
+        page_title="Content Repurposer",
+        page_icon="📝",
+        layout="wide",
+    )
+
+    if 'api_key' not in st.session_state:
+        st.session_state.api_key = ""
+    if 'api_key_valid' not in st.session_state:
+        st.session_state.api_key_valid = False
+
+    st.title("🔄 Content Repurposer")
+    st.subheader("Transform your articles into multiple content formats")
+
+    about_panel()
+
     st.subheader("🔑 API Key")
 
     api_key_col1, api_key_col2 = st.columns([3, 1])
@@ -74,7 +204,7 @@ def main():
         if st.button("Validate Key"):
             if is_valid_api_key(api_key):
                 try:
-                    test_handler = GeminiHandler(api_key=api_key)
+                    get_gemini_handler(api_key)
                     st.session_state.api_key = api_key
                     st.session_state.api_key_valid = True
                     st.success("API key is valid!")
@@ -128,7 +258,7 @@ def main():
                     with st.expander("LinkedIn Post Instructions"):
                         custom_instructions["linkedin"] = st.text_area(
                             "Custom instructions for LinkedIn Post",
-                            placeholder="E.g., Use more emojis, focus on leadership aspects, include a call-to-action at the end",
+                            placeholder=INSTRUCTION_PLACEHOLDERS["linkedin"],
                             key="linkedin_instructions"
                         )
 
@@ -137,7 +267,7 @@ def main():
                     with st.expander("Twitter Thread Instructions"):
                         custom_instructions["twitter"] = st.text_area(
                             "Custom instructions for Twitter Thread",
-                            placeholder="E.g., Include relevant hashtags, focus on data points, use more engaging language",
+                            placeholder=INSTRUCTION_PLACEHOLDERS["twitter"],
                             key="twitter_instructions"
                         )
 
@@ -147,7 +277,7 @@ def main():
                     with st.expander("Email Newsletter Instructions"):
                         custom_instructions["email"] = st.text_area(
                             "Custom instructions for Email Newsletter",
-                            placeholder="E.g., Write in a professional tone, include a personal story, add bullet points for key takeaways",
+                            placeholder=INSTRUCTION_PLACEHOLDERS["email"],
                             key="email_instructions"
                         )
 
@@ -156,14 +286,18 @@ def main():
                     with st.expander("Thought Leadership Instructions"):
                         custom_instructions["thought_leadership"] = st.text_area(
                             "Custom instructions for Thought Leadership Comments",
-                            placeholder="E.g., Focus on industry trends, mention competing viewpoints, pose thought-provoking questions",
+                            placeholder=INSTRUCTION_PLACEHOLDERS["thought_leadership"],
                             key="thought_leadership_instructions"
                         )
 
         # API configuration
         with st.expander("Advanced Settings"):
-            delay_seconds = st.slider("Delay between API calls (seconds)", 1, 10, 3,
-                                    help="Increase this value if you're hitting API rate limits")
+            requests_per_minute = st.slider("Requests per minute allowed by your API tier", 1, 100, 15,
+                                    help="Decrease this value if you're hitting API rate limits")
+
+        # The slider only changes the shared limiter's quota; its request history is kept
+        rate_limiter = get_rate_limiter(st.session_state.api_key)
+        rate_limiter.set_rpm(requests_per_minute)
 
         # Gather selected content types
         selected_types = []
@@ -202,11 +336,8 @@ def main():
                     progress_text = st.empty()
 
                     try:
-                        # Initialize repurposer with user's API key
-                        repurposer = ContentRepurposer(api_key=st.session_state.api_key)
-
-                        # Content data dictionary to store title and content
-                        content_data = {"title": "", "content": ""}
+                        # Reuse the repurposer for the user's API key
+                        repurposer = get_repurposer(st.session_state.api_key)
 
                         # Handle different input methods
                         if input_method == "URL":
@@ -215,31 +346,42 @@ def main():
                             progress_bar.progress(10)
 
                             # Fetch content from URL
-                            content_data = repurposer.fetcher.fetch_content(url)
-                            if not content_data["content"]:
+                            try:
+                                content_data = cached_fetch(url)
+                            except FetchError:
                                 st.error("Access denied by the provider. Please try 'Paste Content' option or use a different URL.")
                                 return
 
-                            # Process with the repurpose method
+                            # Process the fetched content directly so the URL isn't fetched again
+                            title, content = content_data["title"], content_data["content"]
                             progress_text.text("Processing content...")
-                            progress_bar.progress(20)
-                            results = repurposer.repurpose(url, selected_types, delay_seconds, custom_instructions)
                         else:
                             # For manually pasted content
+                            title, content = article_title, pasted_content
                             progress_text.text("Processing pasted content...")
                             progress_bar.progress(10)
 
-                            # Process with the repurpose_from_text method
-                            results = repurposer.repurpose_from_text(
-                                article_title,
-                                pasted_content,
-                                selected_types,
-                                delay_seconds,
-                                custom_instructions
-                            )
+                        progress_bar.progress(20)
+
+                        # Stream every content type into its own tab as it is generated
+                        streams = stream_by_type(
+                            repurposer.arepurpose_stream(title, content, selected_types, custom_instructions),
+                            selected_types
+                        )
+                        tabs = st.tabs([content_type.capitalize() for content_type in selected_types])
+
+                        results = {}
+                        for i, content_type in enumerate(selected_types):
+                            with tabs[i]:
+                                st.markdown("### " + content_type.capitalize() + " Content")
+
+                                # Display the content with markdown rendering as it arrives
+                                results[content_type] = st.write_stream(streams[content_type])
+                                show_result_actions(content_type, results[content_type])
+
+                            progress_bar.progress(20 + 80 * (i + 1) // len(selected_types))
 
                         # Complete progress
-                        progress_bar.progress(100)
                         progress_text.text("All content generated successfully!")
                         time.sleep(1)
 
@@ -250,30 +392,8 @@ def main():
                         # Update status
                         status_container.success("Content repurposed successfully!")
 
-                        # Create tabs for each content type
-                        tabs = st.tabs([content_type.capitalize() for content_type in selected_types])
-
-                        for i, content_type in enumerate(selected_types):
-                            with tabs[i]:
-                                st.markdown("### " + content_type.capitalize() + " Content")
-
-                                # Display the content with markdown rendering
-                                st.markdown(results[content_type])
-
-                                # Also provide a raw text area for copying
-                                with st.expander("Show copyable version"):
-                                    st.text_area(
-                                        "Raw Content",
-                                        value=results[content_type],
-                                        height=400
-                                    )
-
-                                st.download_button(
-                                    label=f"Download {content_type.capitalize()} Content",
-                                    data=results[content_type],
-                                    file_name=f"{content_type}_content.txt",
-                                    mime="text/plain"
-                                )
+                        # Keep the results so later reruns can show them without regenerating
+                        st.session_state.results = results
 
                     except Exception as e:
                         status_container.error(f"An error occurred: {str(e)}")
@@ -281,10 +401,10 @@ def main():
                         progress_text.text(f"Error: {str(e)}")
 
                         # Show error details and suggestions
-                        if "429" in str(e):
+                        if "429" in str(e) or isinstance(e, DailyQuotaExceeded):
                             st.error("""
                             You've hit API rate limits. Try these solutions:
-                            1.  Increase the delay between API calls in Advanced Settings
+                            1.  Lower the requests per minute in Advanced Settings
                             2.  Generate fewer content types at once
                             3.  Try again later when your quota resets
                             """)
@@ -292,6 +412,11 @@ def main():
                             st.error("API key error. Please check your Gemini API key and try validating it again.")
                         else:
                             st.error("An unknown error occurred. Please check the logs for details.")
+        elif st.session_state.get("results"):
+            # Keep showing the last generated content across reruns
+            show_results(st.session_state.results)
+
+        show_rate_limit_usage(rate_limiter)
     else:
         # Show a placeholder when API key is not valid
         st.info("Please enter and validate your API key to use the app.")
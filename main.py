@@ -23,10 +23,12 @@ def main():
     parser.add_argument('url', help='URL to fetch content from')
     parser.add_argument('--types', nargs='+', default=['linkedin', 'twitter', 'email', 'thought_leadership'],
                         help='Content types to generate (linkedin, twitter, email, thought_leadership)')
+    parser.add_argument('--cache-dir', default='.cache',
+                        help='Directory to cache Gemini responses and chunk summaries in between runs')
     
     args = parser.parse_args()
     
-    repurposer = ContentRepurposer()
+    repurposer = ContentRepurposer(cache_dir=args.cache_dir)
     results = repurposer.repurpose(args.url, args.types)
     
     for content_type, content in results.items():
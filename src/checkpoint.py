@@ -0,0 +1,70 @@
+# checkpoint.py
+
+import hashlib
+import json
+import logging
+import os
+import threading
+
+logger = logging.getLogger(__name__)
+
+class JSONLCheckpoint:
+    """
+    Append-only JSONL record of finished work, so a rerun after a failure
+    can skip everything that already completed.
+    """
+
+    def __init__(self, path):
+        """
+        Open a checkpoint file, loading any entries already in it.
+
+        Args:
+            path (str): Path of the JSONL file; created on the first record
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._done = {}
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                        self._done[entry["key"]] = entry["value"]
+                    except (ValueError, KeyError):
+                        # A line cut short by a crash mid-write; that item is simply redone
+                        continue
+            logger.info("Loaded %s checkpointed entries from %s", len(self._done), path)
+
+    @staticmethod
+    def make_key(kind, *parts):
+        """
+        Build a key from the kind of work and the inputs that determine its result.
+
+        Returns:
+            str: "<kind>:<sha1 of the parts>"
+        """
+        digest = hashlib.sha1("\0".join(parts).encode("utf-8")).hexdigest()
+        return f"{kind}:{digest}"
+
+    def get(self, key):
+        """
+        Get the checkpointed result for a key.
+
+        Returns:
+            str: The recorded value, or None if that work has not been done
+        """
+        return self._done.get(key)
+
+    def record(self, key, value):
+        """
+        Record a finished result and flush it to disk straight away.
+
+        Args:
+            key (str): Key from make_key
+            value (str): Result to record
+        """
+        with self._lock:
+            self._done[key] = value
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps({"key": key, "value": value}, ensure_ascii=False) + "\n")
+                f.flush()
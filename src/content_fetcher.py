@@ -1,60 +1,217 @@
 #  content_fetcher.py
 
 
+import asyncio
+import re
 import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer, Tag
+from bs4.dammit import EncodingDetector
 import trafilatura
 import logging
 import time
 import random
+import hashlib
+import threading
+from collections import Counter, OrderedDict
+from html import unescape
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from urllib.parse import urlparse
 import cloudscraper  
-from requests.exceptions import RequestException
+from requests.adapters import HTTPAdapter
+from requests.exceptions import RequestException, HTTPError
 from fake_useragent import UserAgent
+from tenacity import (
+    Retrying, retry_if_exception_type, stop_after_attempt, stop_when_event_set, stop_never,
+    wait_exponential_jitter, wait_fixed, wait_random, before_sleep_log
+)
+from src.retry import RateLimitError, parse_retry_after, wait_retry_after
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# lxml is several times faster than the built-in parser; fall back if it isn't installed
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = "lxml"
+except ImportError:
+    HTML_PARSER = "html.parser"
+
+# Only the <body> is ever inspected, so everything in <head> (scripts, styles,
+# metadata) is skipped while parsing rather than afterwards. lxml always adds a
+# <body>, but html.parser only keeps a literal one, so it parses the whole document.
+_BODY_STRAINER = SoupStrainer('body') if HTML_PARSER == "lxml" else None
+
+# Common content containers in priority order, as (attribute, value) pairs equivalent to the
+# selectors article, main, .content, #content, .post, .entry, .article, .blog-post, [itemprop=...]
+_CONTENT_CONTAINERS = [
+    ('name', 'article'), ('name', 'main'),
+    ('class', 'content'), ('id', 'content'),
+    ('class', 'post'), ('class', 'entry'), ('class', 'article'), ('class', 'blog-post'),
+    ('itemprop', 'articleBody'), ('itemprop', 'mainEntityOfPage')
+]
+_CONTAINER_NOISE_SELECTOR = 'nav, aside, footer, .ads, .ad-container, .related-posts, .comments, .social-share'
+_PAGE_NOISE_SELECTOR = 'script, style, header, footer, nav, aside, .ads, .ad-container, .comments'
+_PAGE_NOISE_TAGS = frozenset(['script', 'style', 'header', 'footer', 'nav', 'aside'])
+_PAGE_NOISE_CLASSES = frozenset(['ads', 'ad-container', 'comments'])
+
+def _matches_container(tag, attr, value):
+    if attr == 'name':
+        return tag.name == value
+    if attr == 'class':
+        return value in tag.get('class', ())
+    return tag.get(attr) == value
+
+def _is_page_noise(tag):
+    return tag.name in _PAGE_NOISE_TAGS or not _PAGE_NOISE_CLASSES.isdisjoint(tag.get('class', ()))
+
+# The title is pulled from the raw HTML so no parse is needed on the trafilatura path;
+# a bytes twin handles undecoded response bodies
+_TITLE_RE = re.compile(r'<title[^>]*>(.*?)</title>', re.IGNORECASE | re.DOTALL)
+_TITLE_RE_BYTES = re.compile(rb'<title[^>]*>(.*?)</title>', re.IGNORECASE | re.DOTALL)
+
+def _decode_title(title_bytes, html_content):
+    """
+    Decode title bytes with the page's declared charset, falling back to UTF-8 and then
+    windows-1252 (what browsers assume for undeclared legacy pages)
+    """
+    declared = EncodingDetector.find_declared_encoding(html_content, is_html=True)
+    for encoding in filter(None, (declared, 'utf-8')):
+        try:
+            return title_bytes.decode(encoding)
+        except (LookupError, UnicodeDecodeError):
+            continue
+    return title_bytes.decode('windows-1252', errors='replace')
+
+def _extract_title(html_content):
+    """Get the unescaped contents of the page's <title> tag, or an empty string"""
+    if isinstance(html_content, bytes):
+        match = _TITLE_RE_BYTES.search(html_content)
+        title = _decode_title(match.group(1), html_content) if match else ""
+    else:
+        match = _TITLE_RE.search(html_content)
+        title = match.group(1) if match else ""
+    return unescape(title).strip()
+
+# Dedicated pool for the racing fetch methods; unlike the loop's default executor,
+# asyncio.run() doesn't wait for it, so stragglers don't delay the winning result
+_FETCH_EXECUTOR = ThreadPoolExecutor(max_workers=8, thread_name_prefix="content-fetch")
+
+# Fallback user agent options if fake_useragent fails
+_FALLBACK_USER_AGENTS = [
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36',
+    'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/16.5 Safari/605.1.15',
+    'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36',
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:112.0) Gecko/20100101 Firefox/121.0'
+]
+
+# Static request headers; only User-Agent and Referer vary per request
+_BASE_HEADERS = {
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.5',
+    'Accept-Encoding': 'gzip, deflate, br',
+    'DNT': '1',  # Do Not Track
+    'Connection': 'keep-alive',
+    'Upgrade-Insecure-Requests': '1',
+    'Sec-Fetch-Dest': 'document',
+    'Sec-Fetch-Mode': 'navigate',
+    'Sec-Fetch-Site': 'none',
+    'Sec-Fetch-User': '?1',
+    'Cache-Control': 'max-age=0',
+}
+
+@lru_cache(maxsize=None)
+def _get_user_agent():
+    """Build the UserAgent database once per process; None if fake_useragent fails"""
+    try:
+        return UserAgent()
+    except Exception:
+        logger.warning("Failed to initialize UserAgent, using default fallback")
+        return None
+
+# Links to files that never contain an HTML article
+_NON_HTML_EXTENSIONS = (
+    '.pdf', '.jpg', '.jpeg', '.png', '.gif', '.webp', '.svg',
+    '.mp3', '.mp4', '.mov', '.avi', '.zip', '.gz', '.tar', '.exe'
+)
+
+def _is_fetchable_url(url):
+    """Check that a URL is http(s) with a host and doesn't point at a non-HTML file"""
+    parsed = urlparse(url.strip())
+    if parsed.scheme not in ('http', 'https') or not parsed.netloc:
+        logger.warning("Not a valid http(s) URL: %s", url)
+        return False
+    if parsed.path.lower().endswith(_NON_HTML_EXTENSIONS):
+        logger.warning("URL points to a non-HTML file: %s", url)
+        return False
+    return True
+
+# Process-level cache of successful fetches, keyed by the hash of the normalized URL
+FETCH_CACHE_TTL = 3600
+FETCH_CACHE_MAX_ENTRIES = 128
+
+# Number of Cloudflare-protected hosts remembered per fetcher
+CF_HOSTS_MAX_ENTRIES = 256
+_fetch_cache = OrderedDict()
+_fetch_cache_lock = threading.Lock()
+
+def _fetch_cache_key(url):
+    """Hash a URL after normalizing its scheme/host case and dropping the fragment"""
+    parsed = urlparse(url.strip())
+    normalized = parsed._replace(
+        scheme=parsed.scheme.lower(),
+        netloc=parsed.netloc.lower(),
+        fragment=""
+    ).geturl()
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+def _get_cached_fetch(key):
+    with _fetch_cache_lock:
+        entry = _fetch_cache.get(key)
+        if entry is None:
+            return None
+        stored_at, result = entry
+        if time.monotonic() - stored_at > FETCH_CACHE_TTL:
+            del _fetch_cache[key]
+            return None
+        _fetch_cache.move_to_end(key)
+        return dict(result)
+
+def _set_cached_fetch(key, result):
+    with _fetch_cache_lock:
+        _fetch_cache[key] = (time.monotonic(), dict(result))
+        _fetch_cache.move_to_end(key)
+        while len(_fetch_cache) > FETCH_CACHE_MAX_ENTRIES:
+            _fetch_cache.popitem(last=False)
+
 class ContentFetcher:
     """Fetches content from URLs using multiple methods for reliability."""
     
     def __init__(self):
-        # Initialize with a rotating set of user agents for better disguise
-        try:
-            self.user_agent = UserAgent()
-        except:
-            # Fallback if fake_useragent fails
-            self.user_agent = None
-            logger.warning("Failed to initialize UserAgent, using default fallback")
+        # Rotating set of user agents for better disguise, shared by every fetcher
+        self.user_agent = _get_user_agent()
+        
+        # Pooled session so repeated requests reuse connections instead of new TCP/TLS handshakes
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=16, pool_maxsize=16, max_retries=0)
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+        
+        # Cloudscraper primes its challenge solver on creation, so build it once and reuse it;
+        # its state isn't thread-safe, so requests through it are serialized
+        self._scraper = cloudscraper.create_scraper(browser='chrome')
+        self._scraper_lock = threading.Lock()
+        
+        # Small LRU of hosts where only cloudscraper succeeded
+        self._cf_hosts = OrderedDict()
+        self._cf_hosts_lock = threading.Lock()
     
     def get_random_headers(self, url=None):
         """Generate random headers to avoid detection"""
+        headers = _BASE_HEADERS.copy()
         if self.user_agent:
-            user_agent = self.user_agent.random
+            headers['User-Agent'] = self.user_agent.random
         else:
-            # Fallback user agent options
-            user_agents = [
-                'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36',
-                'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/16.5 Safari/605.1.15',
-                'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36',
-                'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:112.0) Gecko/20100101 Firefox/121.0'
-            ]
-            user_agent = random.choice(user_agents)
-            
-        headers = {
-            'User-Agent': user_agent,
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.5',
-            'Accept-Encoding': 'gzip, deflate, br',
-            'DNT': '1',  # Do Not Track
-            'Connection': 'keep-alive',
-            'Upgrade-Insecure-Requests': '1',
-            'Sec-Fetch-Dest': 'document',
-            'Sec-Fetch-Mode': 'navigate',
-            'Sec-Fetch-Site': 'none',
-            'Sec-Fetch-User': '?1',
-            'Cache-Control': 'max-age=0',
-        }
+            headers['User-Agent'] = random.choice(_FALLBACK_USER_AGENTS)
         
         # Add a referer that makes sense
         if url:
@@ -69,49 +226,145 @@ class ContentFetcher:
             
         return headers
         
-    def fetch_with_regular_requests(self, url, max_retries=3):
-        """Attempt to fetch content using regular requests with retries and backoff"""
-        for attempt in range(max_retries):
-            try:
-                # Add small random delay between retries to avoid detection patterns
-                if attempt > 0:
-                    time.sleep(2 + random.random() * 3)
-                    
-                headers = self.get_random_headers(url)
-                response = requests.get(url, headers=headers, timeout=15)
-                
-                if response.status_code == 200:
-                    print("\n\nResponse: ", response.text, "\n\n")
-                    return response.text
-                elif response.status_code == 403 or response.status_code == 429:
-                    logger.warning(f"Access denied (status {response.status_code}), retrying with different headers")
-                    continue
-                else:
-                    logger.warning(f"Request failed with status code: {response.status_code}")
-                    
-            except RequestException as e:
-                logger.warning(f"Request failed (attempt {attempt+1}/{max_retries}): {e}")
-                
+    def fetch_with_regular_requests(self, url, cancel=None):
+        """
+        Attempt to fetch content using regular requests with retries and backoff.
+        
+        Args:
+            url (str): URL to fetch
+            cancel (threading.Event, optional): Once set, retrying stops and any backoff is cut short
+        """
+        try:
+            return self._get_html(url, cancel)
+        except RateLimitError as e:
+            logger.warning("Still rate limited after retries: %s", e)
+        except RequestException as e:
+            logger.warning("Request failed after retries: %s", e)
         return None
+    
+    def _get_html(self, url, cancel=None):
+        """
+        GET a page with retries. Rate limiting (429) backs off exponentially and honors
+        Retry-After, while transport errors, 403s and 5xx get a few quick retries with fresh headers.
+        """
+        # Backoff sleeps wait on the cancel event so a cancelled fetch frees its thread straight away
+        sleep = cancel.wait if cancel else time.sleep
+        stop_if_cancelled = stop_when_event_set(cancel) if cancel else stop_never
+        rate_limit_retrying = Retrying(
+            retry=retry_if_exception_type(RateLimitError),
+            wait=wait_retry_after(wait_exponential_jitter(initial=1, max=60)),
+            stop=stop_after_attempt(6) | stop_if_cancelled,
+            sleep=sleep,
+            before_sleep=before_sleep_log(logger, logging.WARNING),
+            reraise=True
+        )
+        request_retrying = Retrying(
+            retry=retry_if_exception_type(RequestException),
+            wait=wait_fixed(1) + wait_random(0, 1),
+            stop=stop_after_attempt(3) | stop_if_cancelled,
+            sleep=sleep,
+            before_sleep=before_sleep_log(logger, logging.WARNING),
+            reraise=True
+        )
+        return rate_limit_retrying(request_retrying, self._get_once, url, cancel)
+    
+    def _get_once(self, url, cancel=None):
+        """Single GET request, raising on statuses that are worth retrying"""
+        if cancel is not None and cancel.is_set():
+            return None
+        headers = self.get_random_headers(url)
+        response = self._session.get(url, headers=headers, timeout=15)
         
-    def fetch_with_cloudscraper(self, url):
-        """Use cloudscraper to bypass Cloudflare protection"""
+        if response.status_code == 200:
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Fetched %s bytes from %s", len(response.content), url)
+            return response.content
+        elif response.status_code == 429:
+            raise RateLimitError(
+                f"Rate limited (status 429) by {url}",
+                retry_after=parse_retry_after(response.headers.get("Retry-After"))
+            )
+        elif response.status_code == 403 or response.status_code >= 500:
+            raise HTTPError(f"Request failed with status code: {response.status_code}", response=response)
+        else:
+            logger.warning("Request failed with status code: %s", response.status_code)
+            return None
+        
+    def fetch_with_cloudscraper(self, url, cancel=None):
+        """
+        Use cloudscraper to bypass Cloudflare protection.
+        
+        Args:
+            url (str): URL to fetch
+            cancel (threading.Event, optional): Once set, stop waiting for the shared scraper
+        """
         try:
-            scraper = cloudscraper.create_scraper(browser='chrome')
-            response = scraper.get(url, timeout=20)
+            # Wait for the shared scraper in short steps so a cancelled fetch gives up its thread
+            while not self._scraper_lock.acquire(timeout=0.1):
+                if cancel is not None and cancel.is_set():
+                    return None
+            try:
+                if cancel is not None and cancel.is_set():
+                    return None
+                response = self._scraper.get(url, timeout=20)
+            finally:
+                self._scraper_lock.release()
             
             if response.status_code == 200:
-                return response.text
+                return response.content
             else:
-                logger.warning(f"Cloudscraper request failed with status code: {response.status_code}")
+                logger.warning("Cloudscraper request failed with status code: %s", response.status_code)
                 return None
                 
         except Exception as e:
-            logger.warning(f"Cloudscraper extraction failed: {e}")
+            logger.warning("Cloudscraper extraction failed: %s", e)
             return None
     
+    @staticmethod
+    def _scan_tree(soup):
+        """
+        Walk the parsed tree once, in document order.
+        
+        Returns:
+            tuple: (first element matching each entry of _CONTENT_CONTAINERS keyed by its
+                    priority, paragraph count per parent id, parent element per id).
+                    Paragraphs inside page noise (scripts, nav, comments...) aren't counted.
+        """
+        container_hits = {}
+        parent_pcount = Counter()
+        parents_by_id = {}
+        
+        stack = [(soup, False)]
+        while stack:
+            element, in_noise = stack.pop()
+            
+            for priority, (attr, value) in enumerate(_CONTENT_CONTAINERS):
+                if priority not in container_hits and _matches_container(element, attr, value):
+                    container_hits[priority] = element
+            
+            in_noise = in_noise or _is_page_noise(element)
+            if element.name == 'p' and not in_noise:
+                # Keyed by id() so counting never goes through Tag.__hash__/__eq__
+                parent_id = id(element.parent)
+                parent_pcount[parent_id] += 1
+                parents_by_id.setdefault(parent_id, element.parent)
+            
+            stack.extend((child, in_noise) for child in reversed(element.contents) if isinstance(child, Tag))
+        
+        return container_hits, parent_pcount, parents_by_id
+    
     def extract_content_from_html(self, html_content, url=""):
-        """Extract the main content from HTML"""
+        """
+        Extract the main content from HTML.
+        
+        Args:
+            html_content (bytes or str): Raw response body; bytes are passed straight to
+                trafilatura/lxml, which honor the document's declared charset
+            url (str, optional): URL the HTML was fetched from
+            
+        Returns:
+            dict: A dictionary containing the extracted title and content
+        """
         if not html_content:
             return {"title": "", "content": ""}
             
@@ -123,76 +376,52 @@ class ContentFetcher:
                                          include_links=False,
                                          output_format='txt')
             if result:
-                # Extract title from HTML
-                soup = BeautifulSoup(html_content, 'html.parser')
-                title = soup.title.string if soup.title else ""
-                
                 return {
-                    "title": title.strip(),
+                    "title": _extract_title(html_content),
                     "content": result.strip()
                 }
         except Exception as e:
-            logger.warning(f"Trafilatura extraction failed: {e}")
+            logger.warning("Trafilatura extraction failed: %s", e)
         
         # Method 2: Fallback to Beautiful Soup
         try:
-            soup = BeautifulSoup(html_content, 'html.parser')
+            title = _extract_title(html_content)
+            soup = BeautifulSoup(html_content, HTML_PARSER, parse_only=_BODY_STRAINER)
             
-            # Extract title
-            title = soup.title.string if soup.title else ""
+            # Extract content - one walk finds the common content containers and paragraph parents
+            container_hits, parent_pcount, parents_by_id = self._scan_tree(soup)
             
-            # Extract content - searching for common content containers
             content = ""
-            containers = [
-                'article', 'main', 
-                '.content', '#content', 
-                '.post', '.entry', '.article', '.blog-post',
-                '[itemprop="articleBody"]', '[itemprop="mainEntityOfPage"]'
-            ]
-            
-            for container in containers:
+            for priority in sorted(container_hits):
+                element = container_hits[priority]
+                # Remove nav, ads, etc. from the container
+                for unwanted in element.select(_CONTAINER_NOISE_SELECTOR):
+                    unwanted.extract()
+                content = element.get_text(separator='\n\n')
                 if content:
                     break
-                    
-                elements = soup.select(container)
-                if elements:
-                    # For each found element, remove nav, ads, etc.
-                    for element in elements:
-                        for unwanted in element.select('nav, aside, footer, .ads, .ad-container, .related-posts, .comments, .social-share'):
-                            unwanted.extract()
-                        
-                    content = elements[0].get_text(separator='\n\n')
             
             # If no content found in common containers, get the body text with filtering
             if not content:
-                # Remove unwanted elements
-                for unwanted in soup.select('script, style, header, footer, nav, aside, .ads, .ad-container, .comments'):
-                    unwanted.extract()
-                
                 # Try to find most content-dense element (paragraph density heuristic)
-                p_tags = soup.find_all('p')
-                if p_tags:
-                    # Group p tags by parent to find the densest container
-                    parents = {}
-                    for p in p_tags:
-                        parent = p.parent
-                        if parent not in parents:
-                            parents[parent] = []
-                        parents[parent].append(p)
-                    
-                    # Find parent with most paragraphs
-                    max_parent = max(parents.items(), key=lambda x: len(x[1]))[0]
+                if parent_pcount:
+                    best_id, _ = parent_pcount.most_common(1)[0]
+                    max_parent = parents_by_id[best_id]
+                    for unwanted in max_parent.select(_PAGE_NOISE_SELECTOR):
+                        unwanted.extract()
                     content = max_parent.get_text(separator='\n\n')
-                else:
+                elif soup.body:
                     # Fallback to body text
-                    content = soup.body.get_text(separator='\n\n') if soup.body else ""
+                    for unwanted in soup.body.select(_PAGE_NOISE_SELECTOR):
+                        unwanted.extract()
+                    content = soup.body.get_text(separator='\n\n')
             
             return {
                 "title": title.strip(),
                 "content": content.strip()
             }
-        except Exception as e:
-            logger.error(f"BeautifulSoup extraction failed: {e}")
+        except Exception:
+            logger.exception("BeautifulSoup extraction failed")
             return {
                 "title": "",
                 "content": ""
@@ -201,6 +430,7 @@ class ContentFetcher:
     def fetch_content(self, url):
         """
         Attempts to extract content from a URL using multiple methods.
+        Successful results are cached per process for FETCH_CACHE_TTL seconds.
         
         Args:
             url (str): The URL to fetch content from
@@ -208,47 +438,127 @@ class ContentFetcher:
         Returns:
             dict: A dictionary containing the extracted title and content
         """
-        logger.info(f"Fetching content from: {url}")
+        return asyncio.run(self.afetch_content(url))
+    
+    async def afetch_content(self, url):
+        """
+        Async variant of fetch_content for callers already running an event loop.
         
-        # Method 1: Try fetching with trafilatura directly first (handles most cases)
+        Args:
+            url (str): The URL to fetch content from
+            
+        Returns:
+            dict: A dictionary containing the extracted title and content
+        """
+        # Bail out before any network attempt on URLs that can't yield an article
+        if not _is_fetchable_url(url):
+            return {"title": "", "content": ""}
+        
+        cache_key = _fetch_cache_key(url)
+        cached = _get_cached_fetch(cache_key)
+        if cached is not None:
+            logger.info("Using cached content for: %s", url)
+            return cached
+        
+        result = await self._afetch_uncached(url)
+        if result["content"]:
+            _set_cached_fetch(cache_key, result)
+        return result
+    
+    def _is_cloudflare_host(self, host):
+        with self._cf_hosts_lock:
+            if host in self._cf_hosts:
+                self._cf_hosts.move_to_end(host)
+                return True
+            return False
+    
+    def _remember_winning_method(self, host, method):
+        """Route future requests for host straight to cloudscraper only if that's what worked"""
+        with self._cf_hosts_lock:
+            if method == "cloudscraper":
+                self._cf_hosts[host] = True
+                self._cf_hosts.move_to_end(host)
+                while len(self._cf_hosts) > CF_HOSTS_MAX_ENTRIES:
+                    self._cf_hosts.popitem(last=False)
+            else:
+                self._cf_hosts.pop(host, None)
+    
+    def fetch_with_trafilatura(self, url, cancel=None):
+        """Download and extract content using trafilatura's own fetcher"""
         try:
             downloaded = trafilatura.fetch_url(url)
-            if downloaded:
+            # Skip the extraction work if another method already won
+            if downloaded and not (cancel is not None and cancel.is_set()):
                 result = trafilatura.extract(downloaded, 
                                           include_tables=False, 
                                           include_images=False, 
                                           include_links=False,
                                           output_format='txt')
                 if result:
-                    # Try to get the title separately
-                    title = ""
-                    soup = BeautifulSoup(downloaded, 'html.parser')
-                    title = soup.title.string if soup.title else ""
-                    
                     return {
-                        "title": title.strip(),
+                        "title": _extract_title(downloaded),
                         "content": result.strip()
                     }
         except Exception as e:
-            logger.warning(f"Direct trafilatura extraction failed: {e}")
-        
-        # Method 2: Try with regular requests
-        html_content = self.fetch_with_regular_requests(url)
-        if html_content:
+            logger.warning("Direct trafilatura extraction failed: %s", e)
+        return None
+    
+    def _fetch_and_extract(self, fetch_method, url, cancel=None):
+        """Download HTML with the given method and extract its main content"""
+        html_content = fetch_method(url, cancel)
+        if html_content and not (cancel is not None and cancel.is_set()):
             result = self.extract_content_from_html(html_content, url)
             if result["content"]:
                 return result
+        return None
+    
+    async def _afetch_uncached(self, url):
+        """Race the fetch methods and return the first one that yields content"""
+        logger.info("Fetching content from: %s", url)
         
-        # Method 3: Try with cloudscraper (bypasses Cloudflare protection)
-        html_content = self.fetch_with_cloudscraper(url)
-        if html_content:
-            result = self.extract_content_from_html(html_content, url)
-            if result["content"]:
+        loop = asyncio.get_running_loop()
+        host = urlparse(url).netloc.lower()
+        # Set once a result is in, so losing methods stop retrying and release their threads
+        cancel = threading.Event()
+        # Method 1: trafilatura directly, Method 2: regular requests,
+        # Method 3: cloudscraper (bypasses Cloudflare protection)
+        methods = {
+            "trafilatura": (self.fetch_with_trafilatura, url, cancel),
+            "requests": (self._fetch_and_extract, self.fetch_with_regular_requests, url, cancel),
+            "cloudscraper": (self._fetch_and_extract, self.fetch_with_cloudscraper, url, cancel),
+        }
+        
+        # Hosts where only cloudscraper got through before skip straight to it
+        if self._is_cloudflare_host(host):
+            logger.info("%s needed cloudscraper before, trying it first", host)
+            result = await loop.run_in_executor(_FETCH_EXECUTOR, *methods.pop("cloudscraper"))
+            if result:
                 return result
         
+        async def run_method(name, *call):
+            return name, await loop.run_in_executor(_FETCH_EXECUTOR, *call)
+        
+        tasks = [asyncio.ensure_future(run_method(name, *call)) for name, call in methods.items()]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                try:
+                    name, result = await next_done
+                except Exception as e:
+                    logger.warning("Fetch method failed: %s", e)
+                    continue
+                if result:
+                    self._remember_winning_method(host, name)
+                    return result
+        finally:
+            # Threads can't be interrupted mid-request, but the losers stop at their next
+            # retry or backoff and their results are dropped
+            cancel.set()
+            for task in tasks:
+                task.cancel()
+        
         # If all methods fail, return empty result
-        logger.error(f"All content extraction methods failed for URL: {url}")
+        logger.error("All content extraction methods failed for URL: %s", url)
         return {
             "title": "",
             "content": ""
-        }
\ No newline at end of file
+        }
@@ -2,27 +2,138 @@
 
 
 import google.generativeai as genai
+from google.ai import generativelanguage as glm
+from google.api_core import exceptions as api_exceptions
 import os
+import re
+import json
+import asyncio
 import logging
-import time
-import random
+import threading
+from functools import lru_cache
 from dotenv import load_dotenv
-from templates.prompts import get_template
+from tenacity import (
+    AsyncRetrying, retry_if_exception_type,
+    stop_after_attempt, wait_exponential_jitter, before_sleep_log
+)
+from templates.prompts import get_template, render
+from src.retry import RateLimitError, parse_retry_after, wait_retry_after
+from src.llm_cache import LLMCache
+from src.text_processor import count_tokens
+from src.rate_limiter import GeminiRateLimiter, DailyQuotaExceeded
 
 load_dotenv()
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+DEFAULT_MODEL = 'gemini-1.5-pro'
+
+# Used if the chunk summarization template is missing from templates.prompts
+_FALLBACK_CHUNK = """
+Summarize the following chunk of content from an article titled "{title}".
+Preserve key information, quotes, statistics, and unique insights.
+Maintain the original tone and style.
+
+CHUNK:
+{chunk}
+
+SUMMARY:
+"""
+
+# Chunk summaries only depend on the chunk and title, so they can be kept for a week
+CHUNK_CACHE_TTL = 7 * 24 * 60 * 60
+
+# Matches a ```json ... ``` fence the model sometimes wraps JSON output in
+_JSON_FENCE = re.compile(r"^```(?:json)?\s*|\s*```$")
+
+# Quota errors are retried after the server's suggested delay; the others are transient server faults
+_RATE_LIMIT_ERRORS = (api_exceptions.ResourceExhausted, api_exceptions.TooManyRequests)
+_TRANSIENT_ERRORS = (
+    api_exceptions.ServiceUnavailable,
+    api_exceptions.DeadlineExceeded,
+    api_exceptions.InternalServerError,
+)
+
+_sdk_loop = None
+_sdk_loop_lock = threading.Lock()
+
+def _get_sdk_loop():
+    """
+    Get the event loop every SDK call runs on, starting it on first use.
+    The SDK's grpc.aio client is bound to the loop it first runs in, so calls made from
+    other (often short-lived asyncio.run) loops are handed over to this long-lived one.
+    """
+    global _sdk_loop
+    with _sdk_loop_lock:
+        if _sdk_loop is None:
+            _sdk_loop = asyncio.new_event_loop()
+            threading.Thread(target=_sdk_loop.run_forever, name="gemini-sdk-loop", daemon=True).start()
+        return _sdk_loop
+
+async def _on_sdk_loop(coro):
+    """Run a coroutine on the SDK loop and wait for its result from the calling loop"""
+    return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, _get_sdk_loop()))
+
+async def _next_piece(pieces):
+    """Get the next item of an async iterator, or None once it is exhausted"""
+    try:
+        return await pieces.__anext__()
+    except StopAsyncIteration:
+        return None
+
+async def _close(pieces):
+    await pieces.aclose()
+
+async def _make_async_client(api_key):
+    return glm.GenerativeServiceAsyncClient(client_options={"api_key": api_key})
+
+class _NoSyncClient:
+    """Stands in for a model's sync client so sync SDK calls fail instead of using another key"""
+    
+    def __getattr__(self, name):
+        raise RuntimeError(
+            "GeminiHandler models only have an async client bound to their API key; "
+            "use the async methods (e.g. generate_content_async)"
+        )
+
+def _bind_model_to_key(model, api_key):
+    """
+    Give a GenerativeModel its own clients for api_key instead of the process-wide genai.configure ones.
+    
+    This relies on SDK internals: GenerativeModel._client and ._async_client (checked against the
+    google-generativeai version pinned in requirements.txt). The async client is created on the
+    SDK loop that all of the model's calls run on; the sync client is replaced with one that
+    raises, so a sync call can never fall back to whatever key the environment configures.
+    """
+    model._async_client = asyncio.run_coroutine_threadsafe(
+        _make_async_client(api_key), _get_sdk_loop()
+    ).result()
+    model._client = _NoSyncClient()
+    return model
+
+@lru_cache(maxsize=8)
+def _get_model(api_key, model_name):
+    """
+    Build a GenerativeModel once per (API key, model name).
+    genai.configure is process-wide, so instead of relying on it each model is bound to its own key.
+    """
+    return _bind_model_to_key(genai.GenerativeModel(model_name), api_key)
+
 class GeminiHandler:
     """Handles communication with Gemini API with retry logic."""
     
-    def __init__(self, api_key=None):
+    def __init__(self, api_key=None, rate_limiter=None, cache_enabled=True, cache_dir=None, model_name=DEFAULT_MODEL):
         """
         Initialize the Gemini client.
         
         Args:
             api_key (str, optional): Gemini API key. If None, will try to load from environment.
+            rate_limiter (GeminiRateLimiter, optional): Shared limiter every API call waits on.
+                                                        If None, the handler gets its own default limiter.
+            cache_enabled (bool): Reuse responses for prompts that were already answered
+            cache_dir (str, optional): Directory to persist cached responses and chunk summaries
+                                       in. If None, they are only cached in memory.
+            model_name (str): Gemini model to use
         """
         # Use provided API key or try to get from environment
         if api_key:
@@ -33,42 +144,198 @@ class GeminiHandler:
         if not self.api_key:
             raise ValueError("No Gemini API key provided")
         
-        genai.configure(api_key=self.api_key)
-        self.model = genai.GenerativeModel('gemini-1.5-pro')
+        self.model_name = model_name
+        self.model = _get_model(self.api_key, self.model_name)
+        self.rate_limiter = rate_limiter or GeminiRateLimiter()
+        self.cache = LLMCache(directory=cache_dir) if cache_enabled else None
+        self.chunk_cache = self._make_chunk_cache(cache_dir) if cache_enabled else None
         logger.info("Gemini API initialized")
     
+    @staticmethod
+    def _make_chunk_cache(cache_dir):
+        """Cache for chunk summaries, persisted under cache_dir/chunks if a directory is given"""
+        return LLMCache(
+            directory=os.path.join(cache_dir, "chunks") if cache_dir else None,
+            max_entries=1024,
+            ttl=CHUNK_CACHE_TTL
+        )
+    
+    @staticmethod
+    def _estimate_tokens(prompt):
+        """Token estimate used for TPM budgeting, counted the same way chunks are sized"""
+        return count_tokens([prompt])[0]
+    
+    def _cached_response(self, prompt):
+        """Return (cache key, cached response or None) for a prompt"""
+        if not self.cache:
+            return None, None
+        key = LLMCache.make_key(model=self.model_name, prompt=prompt)
+        return key, self.cache.get(key)
+    
+    def _store_response(self, key, text):
+        """Cache a successful response and pass it through"""
+        if self.cache and key and text:
+            self.cache.set(key, text)
+        return text
+    
+    def _retrying_options(self, max_retries, base_delay):
+        """Tenacity options: back off exponentially (honoring server hints) on rate limits and transient errors"""
+        return dict(
+            retry=retry_if_exception_type((RateLimitError,) + _TRANSIENT_ERRORS),
+            wait=wait_retry_after(wait_exponential_jitter(initial=base_delay, max=60)),
+            stop=stop_after_attempt(max_retries + 1),
+            before_sleep=before_sleep_log(logger, logging.WARNING),
+            reraise=True
+        )
+    
+    @staticmethod
+    def _server_retry_delay(error):
+        """
+        Get the delay the server asked for, from a RetryInfo detail or a Retry-After header.
+        
+        Returns:
+            float: Seconds to wait, or None if the server gave no hint
+        """
+        for detail in getattr(error, "details", None) or ():
+            retry_delay = getattr(detail, "retry_delay", None)
+            if retry_delay is not None:
+                return retry_delay.seconds + retry_delay.nanos / 1e9
+        headers = getattr(getattr(error, "response", None), "headers", None)
+        if headers:
+            return parse_retry_after(headers.get("retry-after"))
+        return None
+    
+    def _raise_if_rate_limited(self, error):
+        """Translate an SDK quota error into RateLimitError carrying the server's retry hint"""
+        if isinstance(error, _RATE_LIMIT_ERRORS):
+            raise RateLimitError(str(error), retry_after=self._server_retry_delay(error)) from error
+    
     def _call_with_retry(self, prompt, max_retries=5, base_delay=2):
         """
         Call Gemini API with exponential backoff retry logic.
+        Synchronous wrapper around _acall_with_retry for callers without an event loop.
+        
+        Args:
+            prompt (str): The prompt to send to Gemini
+            max_retries (int): Maximum number of retry attempts
+            base_delay (int): Base delay in seconds for backoff
+            
+        Returns:
+            str: Model response text
+        """
+        return asyncio.run(self._acall_with_retry(prompt, max_retries, base_delay))
+    
+    async def _acall_with_retry(self, prompt, max_retries=5, base_delay=2, role=None):
+        """
+        Async variant of _call_with_retry using the SDK's native async client.
         
         Args:
             prompt (str): The prompt to send to Gemini
             max_retries (int): Maximum number of retry attempts
             base_delay (int): Base delay in seconds for backoff
+            role (str, optional): Kind of request ("summarize" or "generate"); a GeminiHandlerPool
+                                  uses it to pick an endpoint
             
         Returns:
             str: Model response text
         """
-        retries = 0
-        while retries <= max_retries:
+        key, cached = self._cached_response(prompt)
+        if cached is not None:
+            return cached
+        
+        try:
+            async for attempt in AsyncRetrying(**self._retrying_options(max_retries, base_delay)):
+                with attempt:
+                    await self.rate_limiter.acquire(self._estimate_tokens(prompt))
+                    try:
+                        response = await _on_sdk_loop(self.model.generate_content_async(prompt))
+                    except Exception as e:
+                        self._raise_if_rate_limited(e)
+                        raise
+                    return self._store_response(key, response.text)
+        except Exception as e:
+            # For non-rate limiting errors or if we've run out of retries
+            logger.error("API error: %s", e)
+            raise
+    
+    async def _astream_with_retry(self, prompt, max_retries=5, base_delay=2, role=None):
+        """
+        Stream a Gemini response, retrying rate limits until the stream has started.
+        
+        Args:
+            prompt (str): The prompt to send to Gemini
+            max_retries (int): Maximum number of retry attempts
+            base_delay (int): Base delay in seconds for backoff
+            role (str, optional): Kind of request ("summarize" or "generate"); a GeminiHandlerPool
+                                  uses it to pick an endpoint
+            
+        Yields:
+            str: Successive pieces of the response text
+        """
+        key, cached = self._cached_response(prompt)
+        if cached is not None:
+            yield cached
+            return
+        
+        try:
+            async for attempt in AsyncRetrying(**self._retrying_options(max_retries, base_delay)):
+                with attempt:
+                    await self.rate_limiter.acquire(self._estimate_tokens(prompt))
+                    try:
+                        response = await _on_sdk_loop(self.model.generate_content_async(prompt, stream=True))
+                    except Exception as e:
+                        self._raise_if_rate_limited(e)
+                        raise
+            
+            # The rest of the stream is read on the SDK loop too, one chunk at a time
+            chunks = response.__aiter__()
+            pieces = []
             try:
-                response = self.model.generate_content(prompt)
-                return response.text
-            except Exception as e:
-                if "429" in str(e) and retries < max_retries:
-                    # Calculate delay with exponential backoff and jitter
-                    delay = (base_delay ** retries) + random.uniform(0, 1)
-                    logger.warning(f"Rate limit hit, retrying in {delay:.2f} seconds (attempt {retries+1}/{max_retries})")
-                    time.sleep(delay)
-                    retries += 1
-                else:
-                    # For non-rate limiting errors or if we've run out of retries
-                    logger.error(f"API error: {e}")
-                    raise
+                while (chunk := await _on_sdk_loop(_next_piece(chunks))) is not None:
+                    pieces.append(chunk.text)
+                    yield chunk.text
+            finally:
+                await _on_sdk_loop(_close(chunks))
+            # Only a fully streamed response is cached
+            self._store_response(key, "".join(pieces))
+        except Exception as e:
+            logger.error("API error: %s", e)
+            raise
+    
+    def _build_chunk_prompt(self, chunk, original_title):
+        """Build the summarization prompt for a chunk"""
+        template = get_template("chunk_summarization") or _FALLBACK_CHUNK
+        return template.format(title=original_title, chunk=chunk)
+    
+    def chunk_prompt_tokens(self, original_title):
+        """
+        Count the tokens the summarization prompt adds around a chunk.
+        
+        Args:
+            original_title (str): Original content title for context
+            
+        Returns:
+            int: Tokens in the prompt with an empty chunk
+        """
+        return self._estimate_tokens(self._build_chunk_prompt("", original_title))
     
     def chunk_summarize(self, chunk, original_title):
         """
         Summarize a chunk of text while preserving key information.
+        Synchronous wrapper around chunk_summarize_async.
+        
+        Args:
+            chunk (str): Text chunk to summarize
+            original_title (str): Original content title for context
+            
+        Returns:
+            str: Summarized text
+        """
+        return asyncio.run(self.chunk_summarize_async(chunk, original_title))
+    
+    async def chunk_summarize_async(self, chunk, original_title):
+        """
+        Async variant of chunk_summarize.
         
         Args:
             chunk (str): Text chunk to summarize
@@ -77,34 +344,147 @@ class GeminiHandler:
         Returns:
             str: Summarized text
         """
-        # Try to get template, fallback to hardcoded template if not found
+        prompt = self._build_chunk_prompt(chunk, original_title)
         try:
-            prompt = get_template("chunk_summarization").format(
-                title=original_title,
-                chunk=chunk
-            )
-        except Exception as e:
-            logger.warning(f"Template not found, using fallback: {e}")
-            prompt = f"""
-            Summarize the following chunk of content from an article titled "{original_title}".
-            Preserve key information, quotes, statistics, and unique insights.
-            Maintain the original tone and style.
+            return await self._acall_with_retry(prompt, role="summarize")
+        except DailyQuotaExceeded:
+            # Out of budget for today: fail the whole run so the caller can report it
+            raise
+        except Exception:
+            logger.exception("Error in chunk summarization")
+            return chunk
+    
+    def chunk_summarize_batch(self, chunks, original_title, max_tokens=12000):
+        """
+        Summarize several chunks, packing adjacent chunks into as few requests as possible.
+        Synchronous wrapper around chunk_summarize_batch_async.
+        
+        Args:
+            chunks (list): Text chunks to summarize
+            original_title (str): Original content title for context
+            max_tokens (int): Approximate token budget for the chunks packed into one request
             
-            CHUNK:
-            {chunk}
+        Returns:
+            list: Summarized text for each chunk, in the original order
+        """
+        return asyncio.run(self.chunk_summarize_batch_async(chunks, original_title, max_tokens))
+    
+    async def chunk_summarize_batch_async(self, chunks, original_title, max_tokens=12000, max_concurrency=4,
+                                          on_done=None):
+        """
+        Async variant of chunk_summarize_batch. Batches are summarized concurrently.
+        
+        Args:
+            chunks (list): Text chunks to summarize
+            original_title (str): Original content title for context
+            max_tokens (int): Approximate token budget for the chunks packed into one request
+            max_concurrency (int): Maximum number of summarization requests in flight
+            on_done (callable, optional): Called with (chunk, summary) as soon as each chunk's
+                                          summary is available, before the remaining batches finish
             
-            SUMMARY:
-            """
+        Returns:
+            list: Summarized text for each chunk, in the original order
+        """
+        # Chunk summaries are cached by chunk, so they hit regardless of how chunks get batched
+        keys = [self._chunk_cache_key(chunk, original_title) for chunk in chunks]
+        summaries = [self.chunk_cache.get(key) if self.chunk_cache else None for key in keys]
+        missing = [i for i, summary in enumerate(summaries) if summary is None]
+        if len(missing) < len(chunks):
+            logger.info("Reusing %s cached chunk summaries", len(chunks) - len(missing))
+        if on_done:
+            for chunk, summary in zip(chunks, summaries):
+                if summary is not None:
+                    on_done(chunk, summary)
+        if not missing:
+            return summaries
+        
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        async def summarize(batch, indices):
+            async with semaphore:
+                if len(batch) == 1:
+                    batch_summaries = [await self.chunk_summarize_async(batch[0], original_title)]
+                else:
+                    batch_summaries = await self._summarize_batch(batch, original_title)
+            # Record each batch as it finishes, so a later failure (e.g. DailyQuotaExceeded) keeps it
+            for i, summary in zip(indices, batch_summaries):
+                summaries[i] = summary
+                # A summary equal to its chunk is the error fallback and is not worth keeping
+                if self.chunk_cache and summary != chunks[i]:
+                    self.chunk_cache.set(keys[i], summary)
+                if on_done:
+                    on_done(chunks[i], summary)
         
+        batches = self._pack_batches([chunks[i] for i in missing], max_tokens)
+        logger.info("Summarizing %s chunks in %s requests", len(missing), len(batches))
+        # Batches keep the chunks' order, so they split the missing indices in sequence
+        positions = iter(missing)
+        results = await asyncio.gather(*(
+            summarize(batch, [next(positions) for _ in batch]) for batch in batches
+        ), return_exceptions=True)
+        # Batches already in flight finish and are recorded before a failure is raised
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+        return summaries
+    
+    def _chunk_cache_key(self, chunk, original_title):
+        """Cache key for a chunk summary"""
+        return LLMCache.make_key(model=self.model_name, title=original_title, chunk=chunk)
+    
+    def _pack_batches(self, chunks, max_tokens):
+        """Greedily group adjacent chunks so each group stays within max_tokens"""
+        batches = []
+        current, current_tokens = [], 0
+        for chunk, tokens in zip(chunks, count_tokens(chunks)):
+            if current and current_tokens + tokens > max_tokens:
+                batches.append(current)
+                current, current_tokens = [], 0
+            current.append(chunk)
+            current_tokens += tokens
+        if current:
+            batches.append(current)
+        return batches
+    
+    async def _summarize_batch(self, batch, original_title):
+        """
+        Summarize a batch of chunks with one request, falling back to one request
+        per chunk if the call fails or the response is not a JSON array of the right length.
+        """
+        sections = "\n\n".join(f"[SECTION {i}]:\n{chunk}" for i, chunk in enumerate(batch, 1))
+        prompt = get_template("batch_chunk_summarization").format(
+            title=original_title,
+            count=len(batch),
+            sections=sections
+        )
         try:
-            return self._call_with_retry(prompt)
+            response = await self._acall_with_retry(prompt, role="summarize")
+            summaries = json.loads(_JSON_FENCE.sub("", response.strip()))
+            if (isinstance(summaries, list) and len(summaries) == len(batch)
+                    and all(isinstance(summary, str) for summary in summaries)):
+                return summaries
+            logger.warning("Batch summary did not return %s summaries, summarizing chunks individually", len(batch))
+        except DailyQuotaExceeded:
+            raise
         except Exception as e:
-            logger.error(f"Error in chunk summarization: {e}")
-            return chunk
+            logger.warning("Batch summarization failed (%s), summarizing chunks individually", e)
+        return list(await asyncio.gather(
+            *(self.chunk_summarize_async(chunk, original_title) for chunk in batch)
+        ))
+    
+    def _build_repurposed_prompt(self, content_type, condensed_content, original_title, custom_instruction=""):
+        """
+        Build the generation prompt for a content type.
+        
+        Returns:
+            str: The prompt, or None if the content type is unknown
+        """
+        return render(content_type, original_title, condensed_content, custom_instruction)
     
     def create_repurposed_content(self, content_type, condensed_content, original_title, custom_instruction=""):
         """
         Generate repurposed content based on the content type.
+        Synchronous wrapper around create_repurposed_content_async.
         
         Args:
             content_type (str): Type of content to generate (linkedin, twitter, etc.)
@@ -115,109 +495,58 @@ class GeminiHandler:
         Returns:
             str: Repurposed content
         """
-        # Define fallback prompts for each content type
-        fallback_prompts = {
-            "linkedin": f"""
-            Create a LinkedIn post based on this article titled "{original_title}".
-            Include a compelling hook, 3-4 key insights, and a thought-provoking question or call-to-action.
-            Format with appropriate line breaks and emojis where relevant.
-            Keep under 3,000 characters and make it feel professional but conversational.
-            
-            {"!IMPORTANT INSTRUCTIONS (if above instructions are conflicting, prioritize these): " + custom_instruction if custom_instruction else ""}
-            
-            ARTICLE CONTENT:
-            {condensed_content}
-            
-            LINKEDIN POST:
-            """,
-            
-            "twitter": f"""
-            Create a Twitter thread (5-7 tweets) based on this article titled "{original_title}".
-            First tweet should have a powerful hook.
-            Each subsequent tweet should cover a key point with engaging language.
-            Final tweet should include a thought-provoking question or call-to-action.
-            Include relevant hashtags in the final tweet.
-            Each tweet should be under 280 characters.
-            
-            {"!IMPORTANT INSTRUCTIONS (if above instructions are conflicting, prioritize these): " + custom_instruction if custom_instruction else ""}
-            
-            ARTICLE CONTENT:
-            {condensed_content}
-            
-            TWITTER THREAD:
-            """,
-            
-            "email": f"""
-            Create an email newsletter based on this article titled "{original_title}".
-            Include:
-            1. An engaging subject line
-            2. A personal-feeling introduction
-            3. 3-5 key insights from the article with brief explanations
-            4. A practical takeaway or application for the reader
-            5. A call-to-action
-            
-            Format it professionally with appropriate sections and make it conversational.
-            
-            {"!IMPORTANT INSTRUCTIONS (if above instructions are conflicting, prioritize these): " + custom_instruction if custom_instruction else ""}
-            
-            ARTICLE CONTENT:
-            {condensed_content}
-            
-            EMAIL NEWSLETTER:
-            """,
-            
-            "thought_leadership": f"""
-            Create 3 thought leadership comments that could be used on social media or forums
-            based on this article titled "{original_title}".
-            
-            Each comment should:
-            1. Show expertise and unique insight
-            2. Reference the article content but add new perspective
-            3. Be 2-3 paragraphs long
-            4. End with an open-ended question to encourage discussion
-            
-            {"!IMPORTANT INSTRUCTIONS (if above instructions are conflicting, prioritize these): " + custom_instruction if custom_instruction else ""}
-            
-            ARTICLE CONTENT:
-            {condensed_content}
-            
-            THOUGHT LEADERSHIP COMMENTS:
-            """
-        }
+        return asyncio.run(self.create_repurposed_content_async(
+            content_type, condensed_content, original_title, custom_instruction
+        ))
+    
+    async def create_repurposed_content_async(self, content_type, condensed_content, original_title, custom_instruction=""):
+        """
+        Async variant of create_repurposed_content.
         
-        # Try to get template, fallback to hardcoded template if not found
-        try:
-            # Get the template
-            template = get_template(content_type)
-            
-            # Add custom instruction if provided
-            if custom_instruction:
-                # Add custom instruction before the content
-                template_parts = template.split("ARTICLE CONTENT:")
-                if len(template_parts) > 1:
-                    template = f"{template_parts[0]}\n!IMPORTANT INSTRUCTIONS (if above instructions are conflicting, prioritize these): {custom_instruction}\n\nARTICLE CONTENT:{template_parts[1]}"
-                else:
-                    # If template format is different, append custom instruction at the end
-                    template = f"{template}\n\n{custom_instruction}"
-            
-            prompt = template.format(
-                title=original_title,
-                content=condensed_content
-            )
+        Args:
+            content_type (str): Type of content to generate (linkedin, twitter, etc.)
+            condensed_content (str): Condensed article content
+            original_title (str): Original content title
+            custom_instruction (str, optional): Custom user instructions for content generation
             
-            # If template returns None or empty string, use fallback
-            if not prompt and content_type in fallback_prompts:
-                logger.warning(f"Empty template for {content_type}, using fallback")
-                prompt = fallback_prompts[content_type]
-        except Exception as e:
-            logger.warning(f"Template not found for {content_type}, using fallback: {e}")
-            if content_type in fallback_prompts:
-                prompt = fallback_prompts[content_type]
-            else:
-                return f"Invalid content type: {content_type}"
+        Returns:
+            str: Repurposed content
+        """
+        prompt = self._build_repurposed_prompt(content_type, condensed_content, original_title, custom_instruction)
+        if prompt is None:
+            return f"Invalid content type: {content_type}"
         
         try:    
-            return self._call_with_retry(prompt)
-        except Exception as e:
-            logger.error(f"Error generating {content_type} content after retries: {e}")
-            return f"Error generating {content_type} content. Please try again later."
\ No newline at end of file
+            return await self._acall_with_retry(prompt, role="generate")
+        except DailyQuotaExceeded:
+            raise
+        except Exception:
+            logger.exception("Error generating %s content after retries", content_type)
+            return f"Error generating {content_type} content. Please try again later."
+    
+    async def create_repurposed_content_stream(self, content_type, condensed_content, original_title, custom_instruction=""):
+        """
+        Streaming variant of create_repurposed_content.
+        
+        Args:
+            content_type (str): Type of content to generate (linkedin, twitter, etc.)
+            condensed_content (str): Condensed article content
+            original_title (str): Original content title
+            custom_instruction (str, optional): Custom user instructions for content generation
+            
+        Yields:
+            str: Successive pieces of the repurposed content
+        """
+        prompt = self._build_repurposed_prompt(content_type, condensed_content, original_title, custom_instruction)
+        if prompt is None:
+            yield f"Invalid content type: {content_type}"
+            return
+        
+        try:
+            async for piece in self._astream_with_retry(prompt, role="generate"):
+                yield piece
+        except DailyQuotaExceeded:
+            raise
+        except Exception:
+            logger.exception("Error generating %s content after retries", content_type)
+            yield f"Error generating {content_type} content. Please try again later."
@@ -0,0 +1,207 @@
+# gemini_pool.py
+
+import asyncio
+import logging
+import time
+from src.gemini_handler import GeminiHandler, DEFAULT_MODEL, _TRANSIENT_ERRORS
+from src.rate_limiter import GeminiRateLimiter, DailyQuotaExceeded, DAY
+from src.retry import RateLimitError
+
+logger = logging.getLogger(__name__)
+
+# How often a request waiting for a free endpoint checks again. Polling (rather than an
+# asyncio.Condition bound to one loop) lets requests from any event loop wait on the pool.
+_POLL_INTERVAL = 0.05
+
+class _Endpoint:
+    """One API key/model pair with its in-flight request count, cool-off and daily quota state."""
+
+    def __init__(self, handler, concurrency_limit):
+        self.handler = handler
+        self.concurrency_limit = concurrency_limit
+        self.inflight = 0
+        self.cooling_until = 0.0
+        self.exhausted_until = 0.0
+
+    @property
+    def model_name(self):
+        return self.handler.model_name
+
+    def exhausted(self, now):
+        """Whether the endpoint's daily request budget is used up"""
+        return now < self.exhausted_until
+
+    def available(self, now):
+        return (not self.exhausted(now) and now >= self.cooling_until
+                and self.inflight < self.concurrency_limit)
+
+    def load(self):
+        """Fraction of the endpoint's concurrency in use"""
+        return self.inflight / self.concurrency_limit
+
+class GeminiHandlerPool(GeminiHandler):
+    """
+    Spreads Gemini requests over several endpoints (API keys and/or models).
+    Each request goes to the least loaded endpoint serving its role; an endpoint
+    that hits its quota cools off and the request fails over to the next one.
+    Offers the same API as GeminiHandler, so it can be passed to ContentRepurposer.
+    """
+
+    def __init__(self, endpoints, roles=None, fallback=True, cooldown=60, max_attempts=5,
+                 cache_enabled=True, cache_dir=None):
+        """
+        Initialize the pool.
+
+        Args:
+            endpoints (list): Endpoint dicts with "api_key" and optional "model" (defaults to
+                              gemini-1.5-pro), "concurrency_limit" (defaults to 10) and the key's
+                              "rpm", "tpm" and "rpd" quotas (default to GeminiRateLimiter's)
+            roles (dict, optional): Model to prefer for each role, e.g.
+                                    {"summarize": "gemini-1.5-flash", "generate": "gemini-1.5-pro"}.
+                                    Roles without an entry can use any endpoint.
+            fallback (bool): Let a role use other endpoints when its preferred ones are busy or cooling off
+            cooldown (float): Seconds an endpoint rests after a quota error without a retry hint
+            max_attempts (int): Maximum number of endpoints tried per request. Endpoints skipped
+                                because their daily budget is used up do not count.
+            cache_enabled (bool): Reuse responses for prompts that were already answered
+            cache_dir (str, optional): Directory to persist cached responses and chunk summaries in
+        """
+        if not endpoints:
+            raise ValueError("GeminiHandlerPool needs at least one endpoint")
+        if max_attempts < 1:
+            raise ValueError("max_attempts must be at least 1")
+
+        # Every endpoint has its own handler, and so its own key-bound client, rate limiter and response cache
+        self.endpoints = [
+            _Endpoint(
+                GeminiHandler(
+                    api_key=endpoint["api_key"],
+                    rate_limiter=GeminiRateLimiter(
+                        **{quota: endpoint[quota] for quota in ("rpm", "tpm", "rpd") if quota in endpoint}
+                    ),
+                    cache_enabled=cache_enabled,
+                    cache_dir=cache_dir,
+                    model_name=endpoint.get("model", DEFAULT_MODEL)
+                ),
+                endpoint.get("concurrency_limit", 10)
+            )
+            for endpoint in endpoints
+        ]
+        self.roles = roles or {}
+        self.fallback = fallback
+        self.cooldown = cooldown
+        self.max_attempts = max_attempts
+
+        # Responses are cached by the endpoint handlers; the pool itself only caches chunk summaries,
+        # keyed by the model that summarizes them
+        self.model_name = self.roles.get("summarize", self.endpoints[0].model_name)
+        self.cache = None
+        self.chunk_cache = self._make_chunk_cache(cache_dir) if cache_enabled else None
+
+    def _candidates(self, role):
+        """Endpoints for a role, preferred model first"""
+        model_name = self.roles.get(role)
+        if model_name is None:
+            return self.endpoints
+        preferred = [endpoint for endpoint in self.endpoints if endpoint.model_name == model_name]
+        if not preferred:
+            logger.warning("No endpoint serves %s for role %s, using any endpoint", model_name, role)
+            return self.endpoints
+        if self.fallback:
+            return preferred + [endpoint for endpoint in self.endpoints if endpoint not in preferred]
+        return preferred
+
+    async def _acquire(self, role):
+        """
+        Wait for and claim the least loaded endpoint, preferring the role's model.
+
+        Raises:
+            DailyQuotaExceeded: If every endpoint for the role has used up its daily budget
+        """
+        candidates = self._candidates(role)
+        preferred_model = self.roles.get(role)
+        while True:
+            now = time.monotonic()
+            if all(endpoint.exhausted(now) for endpoint in candidates):
+                raise DailyQuotaExceeded("Every endpoint for this request has used up its daily request budget")
+            available = [endpoint for endpoint in candidates if endpoint.available(now)]
+            if available:
+                # Only spill over to other models when every preferred endpoint is unavailable
+                preferred = [endpoint for endpoint in available if endpoint.model_name == preferred_model]
+                endpoint = min(preferred or available, key=_Endpoint.load)
+                endpoint.inflight += 1
+                return endpoint
+            await asyncio.sleep(_POLL_INTERVAL)
+
+    def _fail_over(self, endpoint, error):
+        """Cool off a rate-limited endpoint, retire an exhausted one and log that the request moves on"""
+        if isinstance(error, DailyQuotaExceeded):
+            # The limiter's day window is rolling, so the budget is only certain to be back after a day
+            endpoint.exhausted_until = time.monotonic() + DAY
+            logger.warning("%s endpoint used up its daily budget, trying another endpoint", endpoint.model_name)
+        elif isinstance(error, RateLimitError):
+            rest = error.retry_after if error.retry_after is not None else self.cooldown
+            endpoint.cooling_until = time.monotonic() + rest
+            logger.warning("%s endpoint rate limited, cooling off for %.1f seconds", endpoint.model_name, rest)
+        else:
+            logger.warning("%s endpoint failed (%s), trying another endpoint", endpoint.model_name, error)
+
+    async def _acall_with_retry(self, prompt, max_retries=5, base_delay=2, role=None):
+        """
+        Send a prompt through the pool, failing over between endpoints.
+        max_retries and base_delay are accepted for compatibility; the pool makes
+        up to max_attempts attempts, each on the best endpoint available at the time.
+
+        Args:
+            prompt (str): The prompt to send to Gemini
+            role (str, optional): Role used to pick the endpoint
+
+        Returns:
+            str: Model response text
+        """
+        attempts = 0
+        while True:
+            endpoint = await self._acquire(role)
+            try:
+                # The pool does the retrying, so each handler gets a single attempt
+                return await endpoint.handler._acall_with_retry(prompt, max_retries=0)
+            except DailyQuotaExceeded as e:
+                self._fail_over(endpoint, e)
+            except (RateLimitError,) + _TRANSIENT_ERRORS as e:
+                attempts += 1
+                if attempts == self.max_attempts:
+                    raise
+                self._fail_over(endpoint, e)
+            finally:
+                endpoint.inflight -= 1
+
+    async def _astream_with_retry(self, prompt, max_retries=5, base_delay=2, role=None):
+        """
+        Stream a response through the pool, failing over between endpoints until the stream has started.
+
+        Args:
+            prompt (str): The prompt to send to Gemini
+            role (str, optional): Role used to pick the endpoint
+
+        Yields:
+            str: Successive pieces of the response text
+        """
+        attempts = 0
+        while True:
+            endpoint = await self._acquire(role)
+            started = False
+            try:
+                async for piece in endpoint.handler._astream_with_retry(prompt, max_retries=0):
+                    started = True
+                    yield piece
+                return
+            except DailyQuotaExceeded as e:
+                # The handler's limiter raises this before sending anything
+                self._fail_over(endpoint, e)
+            except (RateLimitError,) + _TRANSIENT_ERRORS as e:
+                attempts += 1
+                if started or attempts == self.max_attempts:
+                    raise
+                self._fail_over(endpoint, e)
+            finally:
+                endpoint.inflight -= 1
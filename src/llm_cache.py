@@ -0,0 +1,93 @@
+# llm_cache.py
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+import diskcache
+
+logger = logging.getLogger(__name__)
+
+class LLMCache:
+    """
+    Exact-match cache for model responses: an in-process LRU in front of an
+    optional on-disk store that survives restarts.
+    """
+
+    def __init__(self, directory=None, max_entries=256, ttl=24 * 60 * 60):
+        """
+        Initialize the cache.
+
+        Args:
+            directory (str, optional): Directory for the persistent store. If None, only
+                                       the in-process layer is used.
+            max_entries (int): Maximum number of responses kept in memory
+            ttl (int): Default seconds before an entry expires
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk = diskcache.Cache(directory) if directory else None
+
+    @staticmethod
+    def make_key(**fields):
+        """
+        Build a cache key from the fields that determine a response.
+
+        Returns:
+            str: SHA-256 hex digest of the fields serialized as sorted JSON
+        """
+        payload = json.dumps(fields, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        """
+        Look up a cached response.
+
+        Args:
+            key (str): Key from make_key
+
+        Returns:
+            str: The cached response, or None on a miss
+        """
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at is None or time.time() < expires_at:
+                    self._memory.move_to_end(key)
+                    return value
+                del self._memory[key]
+
+        if self._disk is not None:
+            value = self._disk.get(key)
+            if value is not None:
+                # Promote to the memory layer; the disk store tracks its own expiry
+                self._remember(key, value, self.ttl)
+                return value
+        return None
+
+    def set(self, key, value, ttl=None):
+        """
+        Store a response.
+
+        Args:
+            key (str): Key from make_key
+            value (str): Response to cache
+            ttl (int, optional): Seconds before the entry expires; defaults to the cache's ttl
+        """
+        ttl = self.ttl if ttl is None else ttl
+        self._remember(key, value, ttl)
+        if self._disk is not None:
+            self._disk.set(key, value, expire=ttl)
+
+    def _remember(self, key, value, ttl):
+        expires_at = time.time() + ttl if ttl else None
+        with self._lock:
+            self._memory[key] = (expires_at, value)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
@@ -0,0 +1,126 @@
+# rate_limiter.py
+
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+MINUTE = 60
+DAY = 24 * 60 * 60
+
+class DailyQuotaExceeded(Exception):
+    """Raised when the requests-per-day budget is used up."""
+
+class GeminiRateLimiter:
+    """
+    Sliding-window limiter for Gemini's requests/minute, tokens/minute and
+    requests/day quotas. Requests are admitted immediately while there is
+    budget left and only wait when a window is full.
+    """
+
+    def __init__(self, rpm=100, tpm=30000, rpd=1000, safety_margin=0.1):
+        """
+        Initialize the limiter.
+
+        Args:
+            rpm (int): Requests per minute allowed by the API tier
+            tpm (int): Tokens per minute allowed by the API tier
+            rpd (int): Requests per day allowed by the API tier
+            safety_margin (float): Fraction of each quota kept in reserve
+        """
+        self.safety_margin = safety_margin
+        self.rpm = max(1, int(rpm * (1 - safety_margin)))
+        self.tpm = max(1, int(tpm * (1 - safety_margin)))
+        self.rpd = max(1, int(rpd * (1 - safety_margin)))
+
+        # (timestamp, tokens) of requests in the last minute and timestamps for the last day
+        self._minute = deque()
+        self._minute_tokens = 0
+        self._day = deque()
+        # A threading lock (not asyncio) so one limiter can be shared across event loops and threads
+        self._lock = threading.Lock()
+
+    def set_rpm(self, rpm):
+        """
+        Change the requests-per-minute quota, keeping the requests already counted.
+
+        Args:
+            rpm (int): Requests per minute allowed by the API tier
+        """
+        with self._lock:
+            self.rpm = max(1, int(rpm * (1 - self.safety_margin)))
+
+    def _prune(self, now):
+        while self._minute and now - self._minute[0][0] >= MINUTE:
+            _, tokens = self._minute.popleft()
+            self._minute_tokens -= tokens
+        while self._day and now - self._day[0] >= DAY:
+            self._day.popleft()
+
+    def _reserve(self, est_tokens):
+        """
+        Record a request if it fits in the budget.
+
+        Returns:
+            float: 0 if the request was admitted, otherwise seconds to wait before retrying
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._prune(now)
+
+            if len(self._day) >= self.rpd:
+                raise DailyQuotaExceeded(f"Daily request budget of {self.rpd} requests used up")
+
+            # A single oversized request must still be able to go through on an empty window
+            est_tokens = min(est_tokens, self.tpm)
+
+            wait = 0.0
+            if len(self._minute) >= self.rpm:
+                wait = self._minute[0][0] + MINUTE - now
+
+            excess_tokens = self._minute_tokens + est_tokens - self.tpm
+            if excess_tokens > 0:
+                # Wait until enough of the oldest requests have left the window
+                for timestamp, tokens in self._minute:
+                    excess_tokens -= tokens
+                    if excess_tokens <= 0:
+                        wait = max(wait, timestamp + MINUTE - now)
+                        break
+
+            if wait <= 0:
+                self._minute.append((now, est_tokens))
+                self._minute_tokens += est_tokens
+                self._day.append(now)
+            return wait
+
+    async def acquire(self, est_tokens=0):
+        """
+        Wait until a request of the given size fits in the budget.
+
+        Args:
+            est_tokens (int): Estimated number of tokens the request will use
+        """
+        while True:
+            wait = self._reserve(est_tokens)
+            if wait <= 0:
+                return
+            logger.info("Rate limit budget reached, waiting %.2f seconds", wait)
+            await asyncio.sleep(wait)
+
+    def usage(self):
+        """
+        Get the current usage of each quota window.
+
+        Returns:
+            dict: Requests and tokens used in the last minute and requests used today
+        """
+        with self._lock:
+            self._prune(time.monotonic())
+            return {
+                "requests_per_minute": len(self._minute),
+                "tokens_per_minute": self._minute_tokens,
+                "requests_per_day": len(self._day),
+            }
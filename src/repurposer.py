@@ -1,141 +1,271 @@
 # repurposer.py
 
+import asyncio
 import logging
-import time
 from src.content_fetcher import ContentFetcher
 from src.text_processor import TextProcessor
 from src.gemini_handler import GeminiHandler
+from src.checkpoint import JSONLCheckpoint
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Texts GeminiHandler returns in place of content when generation fails
+_ERROR_PREFIXES = ("Error generating", "Invalid content type")
+
 class ContentRepurposer:
     """Orchestrates the content repurposing process."""
     
-    def __init__(self, api_key=None):
+    def __init__(self, api_key=None, rate_limiter=None, cache_dir=None, gemini=None):
         """
         Initialize the repurposer components.
         
         Args:
             api_key (str, optional): Gemini API key to use. If None, will try to load from environment.
+            rate_limiter (GeminiRateLimiter, optional): Limiter shared by all Gemini calls
+            cache_dir (str, optional): Directory to persist Gemini responses and chunk summaries in
+                                       across runs. If None, they are only cached in memory.
+            gemini (GeminiHandler, optional): Handler (or GeminiHandlerPool) to use instead of building
+                                              one; api_key, rate_limiter and cache_dir are then ignored
         """
         self.fetcher = ContentFetcher()
         self.processor = TextProcessor()
-        self.gemini = GeminiHandler(api_key=api_key)
+        self.gemini = gemini or GeminiHandler(api_key=api_key, rate_limiter=rate_limiter, cache_dir=cache_dir)
     
-    def repurpose(self, url, content_types, delay_between_calls=2, custom_instructions=None):
+    def repurpose(self, url, content_types, custom_instructions=None, checkpoint_path=None):
         """
         Repurpose content from a URL into specified formats.
+        Synchronous wrapper around arepurpose for callers without an event loop.
         
         Args:
             url (str): URL to fetch content from
             content_types (list): List of content types to generate
-            delay_between_calls (int): Delay in seconds between API calls
             custom_instructions (dict, optional): Dictionary of custom instructions for each content type
+            checkpoint_path (str, optional): JSONL file recording finished chunk summaries and outputs,
+                                             so a rerun after a failure skips work already done
             
         Returns:
             dict: Dictionary of repurposed content by type
         """
-        logger.info(f"Starting repurposing process for {url}")
+        return asyncio.run(self.arepurpose(url, content_types, custom_instructions, checkpoint_path=checkpoint_path))
+        
+    def repurpose_from_text(self, title, content, content_types, custom_instructions=None, checkpoint_path=None):
+        """
+        Repurpose content from raw text into specified formats.
+        Synchronous wrapper around arepurpose_from_text for callers without an event loop.
+        
+        Args:
+            title (str): Title of the content
+            content (str): Raw content text
+            content_types (list): List of content types to generate
+            custom_instructions (dict, optional): Dictionary of custom instructions for each content type
+            checkpoint_path (str, optional): JSONL file recording finished chunk summaries and outputs,
+                                             so a rerun after a failure skips work already done
+            
+        Returns:
+            dict: Dictionary of repurposed content by type
+        """
+        return asyncio.run(self.arepurpose_from_text(
+            title, content, content_types, custom_instructions, checkpoint_path=checkpoint_path
+        ))
+    
+    async def arepurpose(self, url, content_types, custom_instructions=None, max_concurrency=4, stream=False,
+                         checkpoint_path=None):
+        """
+        Async variant of repurpose that generates all content types concurrently.
+        Pacing is left to the Gemini handler's rate limiter rather than fixed sleeps.
+        
+        Args:
+            url (str): URL to fetch content from
+            content_types (list): List of content types to generate
+            custom_instructions (dict, optional): Dictionary of custom instructions for each content type
+            max_concurrency (int): Maximum number of generation requests in flight
+            stream (bool): Return an async iterator of (content_type, piece) pairs
+                           (see arepurpose_stream) instead of waiting for every output
+            checkpoint_path (str, optional): JSONL file recording finished chunk summaries and outputs,
+                                             so a rerun after a failure skips work already done.
+                                             Not used when streaming.
+            
+        Returns:
+            dict: Dictionary of repurposed content by type, or an async iterator if stream is True
+        """
+        logger.info("Starting repurposing process for %s", url)
+        
+        content_data = await self.fetcher.afetch_content(url)
+        if not content_data["content"]:
+            error = {"error": "Failed to fetch content from URL"}
+            return self._stream_dict(error) if stream else error
+        
+        return await self.arepurpose_from_text(
+            content_data["title"], content_data["content"], content_types,
+            custom_instructions, max_concurrency, stream, checkpoint_path
+        )
+    
+    async def arepurpose_from_text(self, title, content, content_types, custom_instructions=None, max_concurrency=4,
+                                   stream=False, checkpoint_path=None):
+        """
+        Async variant of repurpose_from_text that generates all content types concurrently.
+        Pacing is left to the Gemini handler's rate limiter rather than fixed sleeps.
+        
+        Args:
+            title (str): Title of the content
+            content (str): Raw content text
+            content_types (list): List of content types to generate
+            custom_instructions (dict, optional): Dictionary of custom instructions for each content type
+            max_concurrency (int): Maximum number of generation requests in flight
+            stream (bool): Return an async iterator of (content_type, piece) pairs
+                           (see arepurpose_stream) instead of waiting for every output
+            checkpoint_path (str, optional): JSONL file recording finished chunk summaries and outputs,
+                                             so a rerun after a failure skips work already done.
+                                             Not used when streaming.
+            
+        Returns:
+            dict: Dictionary of repurposed content by type, or an async iterator if stream is True
+        """
+        if stream:
+            return self.arepurpose_stream(title, content, content_types, custom_instructions, max_concurrency)
+        
+        logger.info("Starting repurposing process for content with title: %s", title)
         
         # Initialize custom instructions if not provided
         if custom_instructions is None:
             custom_instructions = {}
         
-        # Step 1: Fetch content
-        content_data = self.fetcher.fetch_content(url)
-        # print("Fetched content in repurposer: ", content_data)
-        if not content_data["content"]:
-            return {"error": "Failed to fetch content from URL"}
+        checkpoint = JSONLCheckpoint(checkpoint_path) if checkpoint_path else None
         
-        # Step 2: Process and chunk text
-        chunks = self.processor.chunk_text(content_data["content"])
+        # Steps 1-3: Chunk, summarize and join the content
+        condensed_content = await self._acondense(title, content, max_concurrency, checkpoint)
         
-        # Step 3: Summarize each chunk
-        logger.info("Summarizing chunks...")
-        summarized_chunks = []
-        for i, chunk in enumerate(chunks):
-            logger.info(f"Processing chunk {i+1}/{len(chunks)}")
-            summary = self.gemini.chunk_summarize(chunk, content_data["title"])
-            summarized_chunks.append(summary)
-            # Add delay between chunk processing
-            if i < len(chunks) - 1:
-                time.sleep(delay_between_calls)
-        
-        # Step 4: Join summarized chunks
-        condensed_content = self.processor.summarize_chunks(chunks, summarized_chunks)
-        
-        # Step 5: Generate repurposed content for each type
-        results = {}
-        for i, content_type in enumerate(content_types):
-            logger.info(f"Generating {content_type} content")
-            
-            # Get custom instructions for this content type if available
-            custom_instruction = custom_instructions.get(content_type, "")
-            
-            repurposed = self.gemini.create_repurposed_content(
-                content_type, condensed_content, content_data["title"], custom_instruction
-            )
-            results[content_type] = repurposed
-            
-            # Add delay between content type generations (except for the last one)
-            if i < len(content_types) - 1:
-                time.sleep(delay_between_calls)
+        # Step 4: Generate all content types concurrently, bounded by the semaphore;
+        # every type shares the same condensed input, so a repeated type is generated once
+        content_types = list(dict.fromkeys(content_types))
+        semaphore = asyncio.Semaphore(max_concurrency)
         
-        return results
+        async def generate(content_type):
+            instruction = custom_instructions.get(content_type, "")
+            if checkpoint:
+                key = JSONLCheckpoint.make_key(content_type, title, condensed_content, instruction)
+                output = checkpoint.get(key)
+                if output is not None:
+                    logger.info("Using checkpointed %s content", content_type)
+                    return output
+            async with semaphore:
+                logger.info("Generating %s content", content_type)
+                output = await self.gemini.create_repurposed_content_async(
+                    content_type, condensed_content, title, instruction
+                )
+            # The handler reports failures as text; only real outputs are checkpointed
+            if checkpoint and not output.startswith(_ERROR_PREFIXES):
+                checkpoint.record(key, output)
+            return output
         
-    def repurpose_from_text(self, title, content, content_types, delay_between_calls=2, custom_instructions=None):
+        outputs = await asyncio.gather(*(generate(content_type) for content_type in content_types))
+        return dict(zip(content_types, outputs))
+    
+    async def arepurpose_stream(self, title, content, content_types, custom_instructions=None, max_concurrency=4):
         """
-        Repurpose content from raw text into specified formats.
+        Repurpose content from raw text, streaming each content type as it is generated.
         
         Args:
             title (str): Title of the content
             content (str): Raw content text
             content_types (list): List of content types to generate
-            delay_between_calls (int): Delay in seconds between API calls
             custom_instructions (dict, optional): Dictionary of custom instructions for each content type
+            max_concurrency (int): Maximum number of generation requests in flight
             
-        Returns:
-            dict: Dictionary of repurposed content by type
+        Yields:
+            tuple: (content_type, piece) pairs in arrival order, interleaved across types.
+                   A piece of None marks the end of that content type's output.
         """
-        logger.info(f"Starting repurposing process for content with title: {title}")
+        logger.info("Starting streaming repurposing process for content with title: %s", title)
         
         # Initialize custom instructions if not provided
         if custom_instructions is None:
             custom_instructions = {}
         
-        # Step 1: Process and chunk text
-        chunks = self.processor.chunk_text(content)
+        condensed_content = await self._acondense(title, content, max_concurrency)
         
-        # Step 2: Summarize each chunk
-        logger.info("Summarizing chunks...")
-        summarized_chunks = []
-        for i, chunk in enumerate(chunks):
-            logger.info(f"Processing chunk {i+1}/{len(chunks)}")
-            summary = self.gemini.chunk_summarize(chunk, title)
-            summarized_chunks.append(summary)
-            # Add delay between chunk processing
-            if i < len(chunks) - 1:
-                time.sleep(delay_between_calls)
+        # Each content type streams into a shared queue so pieces are yielded as soon as they arrive
+        content_types = list(dict.fromkeys(content_types))
+        semaphore = asyncio.Semaphore(max_concurrency)
+        queue = asyncio.Queue()
         
-        # Step 3: Join summarized chunks
-        condensed_content = self.processor.summarize_chunks(chunks, summarized_chunks)
+        async def generate(content_type):
+            try:
+                async with semaphore:
+                    logger.info("Generating %s content", content_type)
+                    async for piece in self.gemini.create_repurposed_content_stream(
+                        content_type, condensed_content, title, custom_instructions.get(content_type, "")
+                    ):
+                        await queue.put((content_type, piece))
+            finally:
+                await queue.put((content_type, None))
         
-        # Step 4: Generate repurposed content for each type
-        results = {}
-        for i, content_type in enumerate(content_types):
-            logger.info(f"Generating {content_type} content")
-            
-            # Get custom instructions for this content type if available
-            custom_instruction = custom_instructions.get(content_type, "")
+        tasks = [asyncio.create_task(generate(content_type)) for content_type in content_types]
+        try:
+            remaining = len(tasks)
+            while remaining:
+                content_type, piece = await queue.get()
+                if piece is None:
+                    remaining -= 1
+                yield content_type, piece
+            # Surface any unexpected failure from the generation tasks
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+    
+    @staticmethod
+    async def _stream_dict(results):
+        """Yield a finished results dict in arepurpose_stream's (content_type, piece) format"""
+        for content_type, text in results.items():
+            yield content_type, text
+            yield content_type, None
+    
+    async def _acondense(self, title, content, max_concurrency=4, checkpoint=None):
+        """
+        Chunk the content, summarize each chunk and join the summaries.
+        
+        Args:
+            title (str): Title of the content
+            content (str): Raw content text
+            max_concurrency (int): Maximum number of summarization requests in flight
+            checkpoint (JSONLCheckpoint, optional): Checkpoint to skip and record chunk summaries in
             
-            repurposed = self.gemini.create_repurposed_content(
-                content_type, condensed_content, title, custom_instruction
+        Returns:
+            str: Condensed content
+        """
+        # Step 1: Process and chunk text, leaving room for the summarization prompt around each chunk
+        chunks = self.processor.chunk_text(content, prompt_overhead=self.gemini.chunk_prompt_tokens(title))
+        
+        # Step 2: Summarize each distinct chunk once, packing adjacent chunks into shared requests;
+        # repeated boilerplate chunks reuse the same summary
+        logger.info("Summarizing chunks...")
+        unique_chunks = list(dict.fromkeys(chunks))
+        if len(unique_chunks) < len(chunks):
+            logger.info("Skipping %s duplicate chunks", len(chunks) - len(unique_chunks))
+        
+        summary_by_chunk = {}
+        if checkpoint:
+            for chunk in unique_chunks:
+                summary = checkpoint.get(JSONLCheckpoint.make_key("chunk", title, chunk))
+                if summary is not None:
+                    summary_by_chunk[chunk] = summary
+            if summary_by_chunk:
+                logger.info("Using %s checkpointed chunk summaries", len(summary_by_chunk))
+        
+        def record(chunk, summary):
+            summary_by_chunk[chunk] = summary
+            # A summary equal to its chunk is the error fallback, so it is redone on the next run
+            if checkpoint and summary != chunk:
+                checkpoint.record(JSONLCheckpoint.make_key("chunk", title, chunk), summary)
+        
+        # Summaries are recorded as each batch finishes, so a failure part-way keeps the finished ones
+        pending = [chunk for chunk in unique_chunks if chunk not in summary_by_chunk]
+        if pending:
+            await self.gemini.chunk_summarize_batch_async(
+                pending, title, max_concurrency=max_concurrency, on_done=record
             )
-            results[content_type] = repurposed
-            
-            # Add delay between content type generations (except for the last one)
-            if i < len(content_types) - 1:
-                time.sleep(delay_between_calls)
+        summarized_chunks = [summary_by_chunk[chunk] for chunk in chunks]
         
-        return results
\ No newline at end of file
+        # Step 3: Join summarized chunks
+        return self.processor.summarize_chunks(chunks, summarized_chunks)
@@ -0,0 +1,64 @@
+# retry.py
+
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from tenacity.wait import wait_base
+
+class RateLimitError(Exception):
+    """Raised when a server rejects a request with HTTP 429 (rate limited)."""
+
+    def __init__(self, message, retry_after=None):
+        """
+        Args:
+            message (str): Error description
+            retry_after (float, optional): Seconds the server asked us to wait
+        """
+        super().__init__(message)
+        self.retry_after = retry_after
+
+def parse_retry_after(value):
+    """
+    Parse a Retry-After header value.
+
+    Args:
+        value (str): Header value, either delta-seconds or an HTTP date
+
+    Returns:
+        float: Seconds to wait, or None if the header is missing or malformed
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+class wait_retry_after(wait_base):
+    """
+    Tenacity wait strategy that honors a RateLimitError's retry_after hint.
+    The hint is a floor: the wait never drops below the fallback backoff.
+    """
+
+    def __init__(self, fallback, max_wait=60):
+        """
+        Args:
+            fallback (wait_base): Wait strategy used when the server gave no hint
+            max_wait (float): Upper bound on any single wait
+        """
+        self.fallback = fallback
+        self.max_wait = max_wait
+
+    def __call__(self, retry_state):
+        exception = retry_state.outcome.exception() if retry_state.outcome else None
+        retry_after = getattr(exception, "retry_after", None)
+        backoff = self.fallback(retry_state)
+        if retry_after is not None:
+            return min(max(retry_after, backoff), self.max_wait)
+        return backoff
@@ -2,17 +2,75 @@
 
 import re
 import logging
+from functools import lru_cache
+
+try:
+    import tiktoken
+except ImportError:  # Token counts fall back to the ~4 chars per token heuristic
+    tiktoken = None
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+_WS_RE = re.compile(r'\s+')
+# Any line break ends a paragraph: trafilatura's text output puts each paragraph on its own line
+_PARA_RE = re.compile(r'\n\s*')
+# Sentence boundaries, used to break up paragraphs too long for a single chunk
+_SENTENCE_RE = re.compile(r'(?<=[.!?])\s+')
+
+@lru_cache(maxsize=1)
+def _get_encoding():
+    """Load the tokenizer once; None if tiktoken or its encoding file is unavailable"""
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        logger.warning("Could not load tiktoken encoding, estimating tokens from length: %s", e)
+        return None
+
+def count_tokens(texts):
+    """
+    Count tokens for a list of texts.
+    Uses tiktoken's cl100k_base encoding as a proxy for Gemini's tokenizer, encoding
+    the whole list in one batch call; falls back to ~4 chars per token without it.
+    
+    Args:
+        texts (list): Texts to count
+        
+    Returns:
+        list: Token count for each text
+    """
+    encoding = _get_encoding()
+    if encoding is None:
+        return [len(text) / 4 for text in texts]
+    return [len(tokens) for tokens in encoding.encode_ordinary_batch(texts)]
+
 class TextProcessor:
     """Processes text content into manageable chunks and formats."""
     
+    @staticmethod
+    def split_paragraphs(text):
+        """
+        Splits text into paragraphs (one per line), collapsing whitespace within each one.
+        
+        Args:
+            text (str): The text to split
+            
+        Returns:
+            list: Non-empty cleaned paragraphs
+        """
+        paragraphs = []
+        for paragraph in _PARA_RE.split(text):
+            paragraph = _WS_RE.sub(' ', paragraph).strip()
+            if paragraph:
+                paragraphs.append(paragraph)
+        return paragraphs
+    
     @staticmethod
     def clean_text(text):
         """
         Cleans text by removing extra whitespace and normalizing line breaks.
+        Paragraph breaks are kept as a single blank line.
         
         Args:
             text (str): The text to clean
@@ -20,55 +78,55 @@ class TextProcessor:
         Returns:
             str: Cleaned text
         """
-        # Remove extra whitespace
-        text = re.sub(r'\s+', ' ', text)
-        # Normalize line breaks
-        text = re.sub(r'\n\s*\n', '\n\n', text)
-        return text.strip()
+        return "\n\n".join(TextProcessor.split_paragraphs(text))
     
     @staticmethod
-    def chunk_text(text, max_tokens=4000):
+    def chunk_text(text, max_tokens=4000, prompt_overhead=0):
         """
         Splits text into chunks respecting paragraph boundaries.
+        A paragraph too long for one chunk is split at sentence boundaries instead.
         
         Args:
             text (str): The text to chunk
-            max_tokens (int): Approximate maximum number of tokens per chunk
-                              (using a simple heuristic of ~4 chars per token)
+            max_tokens (int): Maximum number of tokens per chunk, including prompt_overhead
+            prompt_overhead (int): Tokens reserved for the prompt template each chunk is sent with
             
         Returns:
             list: List of text chunks
         """
-        # Clean the text first
-        text = TextProcessor.clean_text(text)
+        # Split by paragraphs, cleaning each one
+        paragraphs = TextProcessor.split_paragraphs(text)
+        
+        max_tokens -= prompt_overhead
         
-        # Split by paragraphs
-        paragraphs = re.split(r'\n\n+', text)
+        pieces, piece_tokens = [], []
+        for paragraph, paragraph_tokens in zip(paragraphs, count_tokens(paragraphs)):
+            if paragraph_tokens > max_tokens:
+                sentences = _SENTENCE_RE.split(paragraph)
+                pieces.extend(sentences)
+                piece_tokens.extend(count_tokens(sentences))
+            else:
+                pieces.append(paragraph)
+                piece_tokens.append(paragraph_tokens)
         
         chunks = []
-        current_chunk = ""
+        current_parts = []
         current_token_count = 0
         
-        for paragraph in paragraphs:
-            # Estimate token count (rough heuristic: ~4 chars per token)
-            paragraph_tokens = len(paragraph) / 4
-            
-            if current_token_count + paragraph_tokens > max_tokens and current_chunk:
-                chunks.append(current_chunk.strip())
-                current_chunk = paragraph
+        for paragraph, paragraph_tokens in zip(pieces, piece_tokens):
+            if current_token_count + paragraph_tokens > max_tokens and current_parts:
+                chunks.append("\n\n".join(current_parts))
+                current_parts = [paragraph]
                 current_token_count = paragraph_tokens
             else:
-                if current_chunk:
-                    current_chunk += "\n\n" + paragraph
-                else:
-                    current_chunk = paragraph
+                current_parts.append(paragraph)
                 current_token_count += paragraph_tokens
         
         # Add the last chunk if it's not empty
-        if current_chunk:
-            chunks.append(current_chunk.strip())
+        if current_parts:
+            chunks.append("\n\n".join(current_parts))
         
-        logger.info(f"Split content into {len(chunks)} chunks")
+        logger.info("Split content into %s chunks", len(chunks))
         return chunks
     
     @staticmethod
@@ -84,7 +142,7 @@ class TextProcessor:
             str: Joined, summarized content
         """
         if len(chunks) != len(model_output):
-            logger.warning(f"Mismatch in chunk count: {len(chunks)} vs {len(model_output)}")
+            logger.warning("Mismatch in chunk count: %s vs %s", len(chunks), len(model_output))
         
         result = "\n\n".join(model_output)
         return result
\ No newline at end of file
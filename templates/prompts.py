@@ -3,6 +3,8 @@ Prompt templates for content repurposing.
 These templates define how to instruct the AI to transform content into different formats.
 """
 
+from functools import lru_cache
+
 # Template for condensing/summarizing chunks
 CHUNK_SUMMARIZATION_TEMPLATE = """
 You are processing a section of an article titled "{title}". 
@@ -16,6 +18,20 @@ SECTION:
 SUMMARIZED SECTION:
 """
 
+# Template for summarizing several chunks in one request
+BATCH_CHUNK_SUMMARIZATION_TEMPLATE = """
+You are processing {count} sections of an article titled "{title}".
+Summarize each section separately while preserving all key information, facts, and insights.
+Keep the most important quotes and statistics intact.
+Maintain the tone and style of the original content.
+
+Return ONLY a JSON array of {count} strings, where the Nth string is the summary of SECTION N.
+
+{sections}
+
+JSON ARRAY OF SUMMARIES:
+"""
+
 # Template for LinkedIn posts
 LINKEDIN_POST_TEMPLATE = """
 Create a LinkedIn post based on this article titled "{title}".
@@ -93,12 +109,14 @@ THOUGHT LEADERSHIP COMMENTS:
 # Dictionary mapping content types to their templates
 TEMPLATES = {
     "chunk_summarization": CHUNK_SUMMARIZATION_TEMPLATE,
+    "batch_chunk_summarization": BATCH_CHUNK_SUMMARIZATION_TEMPLATE,
     "linkedin": LINKEDIN_POST_TEMPLATE,
     "twitter": TWITTER_THREAD_TEMPLATE,
     "email": EMAIL_NEWSLETTER_TEMPLATE,
     "thought_leadership": THOUGHT_LEADERSHIP_TEMPLATE
 }
 
+@lru_cache(maxsize=None)
 def get_template(template_type):
     """
     Get a prompt template by type.
@@ -109,4 +127,38 @@ def get_template(template_type):
     Returns:
         str: The prompt template
     """
-    return TEMPLATES.get(template_type, "")
\ No newline at end of file
+    return TEMPLATES.get(template_type, "")
+
+# Marker separating a template's instructions from the article it is applied to
+CONTENT_MARKER = "ARTICLE CONTENT:"
+
+# Content templates pre-split around CONTENT_MARKER once at import, so rendering is
+# two small format calls and custom instructions can be injected without re-splitting
+_SPLIT_TEMPLATES = {
+    template_type: template.partition(CONTENT_MARKER)[::2]
+    for template_type, template in TEMPLATES.items()
+    if CONTENT_MARKER in template
+}
+
+def render(content_type, title, content, custom_instruction=""):
+    """
+    Render the prompt for a content type.
+    
+    Args:
+        content_type (str): The type of content to generate
+        title (str): Title of the article
+        content (str): Article content
+        custom_instruction (str, optional): User instructions that take priority over the template
+        
+    Returns:
+        str: The prompt, or None if the content type has no template
+    """
+    parts = _SPLIT_TEMPLATES.get(content_type)
+    if parts is None:
+        return None
+    head, tail = parts
+    instruction = (
+        f"\n!IMPORTANT INSTRUCTIONS (if above instructions are conflicting, prioritize these): {custom_instruction}\n\n"
+        if custom_instruction else ""
+    )
+    return head.format(title=title) + instruction + CONTENT_MARKER + tail.format(content=content)
\ No newline at end of file
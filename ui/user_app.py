@@ -3,27 +3,30 @@ import sys
 import os
 import logging
 import time
-import re
+import string
 import markdown
 
 # Add parent directory to path to import our modules
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from src.repurposer import ContentRepurposer
+from src.rate_limiter import GeminiRateLimiter
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+API_KEY_ALLOWED_CHARS = frozenset(string.ascii_letters + string.digits + "_-")
+
+@st.cache_resource(show_spinner=False)
+def get_rate_limiter(api_key):
+    """One limiter per API key so the budget carries over between runs."""
+    return GeminiRateLimiter()
+
 def is_valid_api_key(api_key):
     """Basic validation for Gemini API key format."""
-    # Check if it's a non-empty string with the expected format
-    if not api_key or not isinstance(api_key, str):
-        return False
-    
-    # Gemini API keys typically follow this pattern
-    pattern = r'^[A-Za-z0-9_-]{39}$'
-    return bool(re.match(pattern, api_key))
+    # Gemini API keys are 39 characters of letters, digits, '_' and '-'
+    return isinstance(api_key, str) and len(api_key) == 39 and set(api_key) <= API_KEY_ALLOWED_CHARS
 
 def main():
     st.set_page_config(
@@ -169,8 +172,8 @@ def main():
         
         # API configuration
         with st.expander("Advanced Settings"):
-            delay_seconds = st.slider("Delay between API calls (seconds)", 1, 10, 3, 
-                                   help="Increase this value if you're hitting API rate limits")
+            requests_per_minute = st.slider("Requests per minute allowed by your API tier", 1, 100, 15,
+                                   help="Decrease this value if you're hitting API rate limits")
         
         # Gather selected content types
         selected_types = []
@@ -209,8 +212,10 @@ def main():
                     progress_text = st.empty()
                     
                     try:
-                        # Initialize repurposer with user's API key
-                        repurposer = ContentRepurposer(api_key=st.session_state.api_key)
+                        # Initialize repurposer with user's API key; the slider only changes the shared limiter's quota
+                        rate_limiter = get_rate_limiter(st.session_state.api_key)
+                        rate_limiter.set_rpm(requests_per_minute)
+                        repurposer = ContentRepurposer(api_key=st.session_state.api_key, rate_limiter=rate_limiter)
                         
                         # Content data dictionary to store title and content
                         content_data = {"title": "", "content": ""}
@@ -230,7 +235,7 @@ def main():
                             # Process with the repurpose method
                             progress_text.text("Processing content...")
                             progress_bar.progress(20)
-                            results = repurposer.repurpose(url, selected_types, delay_seconds, custom_instructions)
+                            results = repurposer.repurpose(url, selected_types, custom_instructions)
                         else:
                             # For manually pasted content
                             progress_text.text("Processing pasted content...")
@@ -241,7 +246,6 @@ def main():
                                 article_title, 
                                 pasted_content, 
                                 selected_types, 
-                                delay_seconds,
                                 custom_instructions
                             )
                         
@@ -291,7 +295,7 @@ def main():
                         if "429" in str(e):
                             st.error("""
                             You've hit API rate limits. Try these solutions:
-                            1. Increase the delay between API calls in Advanced Settings
+                            1. Lower the requests per minute in Advanced Settings
                             2. Generate fewer content types at once
                             3. Try again later when your quota resets
                             """)